@@ -1,2 +1,4 @@
 import os
-DAYS_THRESHOLD=int(os.getenv("CS_DAYS_THRESHOLD", 90))
\ No newline at end of file
+DAYS_THRESHOLD=int(os.getenv("CS_DAYS_THRESHOLD", 90))
+MIN_AGE_SECONDS=int(os.getenv("CS_MIN_AGE_SECONDS", 3600))
+MAX_CONCURRENT_REQUESTS=int(os.getenv("CS_MAX_CONCURRENT_REQUESTS", 32))
@@ -116,7 +116,8 @@ def main():
             accounts=accounts,
             scanners=scanners,
             regions=regions,
-            max_workers=args.max_workers
+            max_workers=args.max_workers,
+            use_processes=args.use_processes
         )
 
         scan_results, scan_metrics = executor.execute()
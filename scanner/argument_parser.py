@@ -28,6 +28,7 @@ class ArgumentParser:
         parser.add_argument("--scanners", default=os.getenv("CS_SCANNERS", "all"), help="Comma-separated list of scanners or 'all' to use all scanners.")
         parser.add_argument("--regions", default=os.getenv("CS_REGIONS", "all"), help="Comma-separated list of regions or 'all' to use all regions.")
         parser.add_argument("--max-workers", type=int, default=int(os.getenv("CS_MAX_WORKERS", os.cpu_count() - 1)), help="Maximum number of workers to use (default: one less than the number of CPUs).")
+        parser.add_argument("--use-processes", action="store_true", default=os.getenv("CS_USE_PROCESSES", "false").lower() == "true", help="Scan each account in its own worker process instead of sharing threads in a single process.")
         parser.add_argument("--days-threshold", type=int, default=int(os.getenv("CS_DAYS_THRESHOLD", 90)), help="The number of days to look back at resource metrics and history to determine if something is unused (default: 90 days).")
         parser.add_argument("--upload-confluence", action="store_true", default=False, help="Set to True if you want to upload reports to Confluence.")
 
@@ -1,23 +1,33 @@
 import boto3
 import json
 import os
+import tempfile
 import threading
+import numpy as np
+from scanner.aws.session_manager import CLIENT_CONFIG
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+HOURS_IN_A_DAY = 24
+MONTHS_IN_A_YEAR = 12
+HOURS_IN_A_MONTH = 720  # Approximate number of hours in a month (30 days)
+
 class CostEstimator:
     """
     AWS Cost Estimator that calculates the cost of resources based on live AWS pricing.
     This version includes caching of price data to a local .json file with thread-safety.
     """
 
+    # Shared by every estimator since they all write the same cache file, possibly from different scanner threads
+    save_lock = threading.Lock()
+
     def __init__(self, cache_file="cost_estimator.json"):
-        self.pricing_client = boto3.client('pricing', region_name="us-east-1")
+        self.pricing_client = boto3.client('pricing', region_name="us-east-1", config=CLIENT_CONFIG)
         self.cache_file = cache_file
         self.price_cache = self._load_cache()
         self.cache_lock = threading.Lock()  # Lock to ensure thread-safe cache access
-        self.save_lock = threading.Lock()  # Separate lock for saving cache
+        self.resource_price_cache = {}  # Unit prices by (resource_type, resource_size, region), including unavailable ones
         logger.debug(f"Initialized CostEstimator with cache file: {self.cache_file}")
 
     def _load_cache(self):
@@ -34,12 +44,25 @@ class CostEstimator:
         return {}
 
     def _save_cache(self):
-        """Saves the pricing cache to the JSON file, thread-safely."""
+        """
+        Saves the pricing cache to the JSON file, thread-safely.
+        Accounts may be scanned in separate processes that do not share the save lock, so the prices already
+        saved by others are merged in and the file is replaced atomically, never leaving it partially written.
+        """
         try:
             logger.debug("Attempting to acquire cache save lock.")
             with self.save_lock:  # Use a separate lock for saving cache
-                with open(self.cache_file, 'w') as f:
-                    json.dump(self.price_cache, f, indent=4)
+                with self.cache_lock:
+                    price_cache = {**self._load_cache(), **self.price_cache}
+                cache_dir = os.path.dirname(os.path.abspath(self.cache_file))
+                with tempfile.NamedTemporaryFile('w', dir=cache_dir, suffix=".tmp", delete=False) as f:
+                    temp_file = f.name
+                    json.dump(price_cache, f, indent=4)
+                try:
+                    os.replace(temp_file, self.cache_file)
+                except OSError:
+                    os.remove(temp_file)
+                    raise
                 logger.info(f"Price cache saved to {self.cache_file}.")
         except Exception as e:
             logger.error(f"Error saving price cache: {e}")
@@ -92,10 +115,16 @@ class CostEstimator:
             logger.error(f"Error retrieving pricing for {service_code}: {error}")
             return None
 
-    def calculate_cost(self, resource_type, resource_size=None, region = "us-east-1", hours_running=0):
+    def _get_resource_price(self, resource_type, resource_size=None, region="us-east-1"):
         """
-        Calculates the cost for a given resource type, size, and running duration.
+        Retrieves the unit price for a given resource type and size, or None if it is unavailable.
+        Results are kept in memory for the lifetime of the estimator, so resources of the same type and size
+        share a single lookup and unavailable prices are not requested from the Pricing API again.
         """
+        resource_key = (resource_type, resource_size, region)
+        if resource_key in self.resource_price_cache:
+            return self.resource_price_cache[resource_key]
+
         # Map resource types to AWS service codes
         service_code_map = {
             "EBS Volumes": "AmazonEC2",  # Correct service code for EBS Volumes
@@ -130,15 +159,18 @@ class CostEstimator:
 
         # Fetch price per hour from AWS Pricing API or cache
         price = self._get_aws_price(service_code, price_filters)
+        with self.cache_lock:
+            self.resource_price_cache[resource_key] = price
+        return price
+
+    def calculate_cost(self, resource_type, resource_size=None, region = "us-east-1", hours_running=0):
+        """
+        Calculates the cost for a given resource type, size, and running duration.
+        """
+        price = self._get_resource_price(resource_type, resource_size, region)
         if price is None:
             logger.warning(f"Could not calculate cost for {resource_type} of size {resource_size}.")
             return None
-        
-        # Constants
-        HOURS_IN_A_DAY = 24
-        DAYS_IN_A_MONTH = 30
-        MONTHS_IN_A_YEAR = 12
-        HOURS_IN_A_MONTH = 720  # Approximate number of hours in a month (30 days)
 
         if resource_type.startswith("EBS"):
             # EBS volumes and snapshots are charged per month
@@ -167,4 +199,37 @@ class CostEstimator:
         }
     
 
-        return combined_cost
\ No newline at end of file
+        return combined_cost
+
+    def calculate_storage_costs(self, resource_type, resource_sizes, hours_running, region="us-east-1"):
+        """
+        Calculates the costs of many EBS volumes or snapshots at once.
+        Their price per GB does not depend on the size, so it is looked up once and applied with NumPy.
+
+        :param resource_type: "EBS Volumes" or "EBS Snapshots".
+        :param resource_sizes: The size in GB of each resource.
+        :param hours_running: The running duration in hours of each resource.
+        :param region: The region used for the pricing lookup.
+        :return: A list of cost breakdowns in the same order as resource_sizes, None where the price is unavailable.
+        """
+        if not resource_type.startswith("EBS"):
+            raise ValueError(f"Storage costs are not supported for resource type: {resource_type}")
+
+        price = self._get_resource_price(resource_type, region=region)
+        if price is None:
+            logger.warning(f"Could not calculate cost for {len(resource_sizes)} {resource_type}.")
+            return [None] * len(resource_sizes)
+
+        price_per_month = price * np.asarray(resource_sizes, dtype=np.float64)  # Monthly cost (per GB)
+        price_per_hour = price_per_month / HOURS_IN_A_MONTH
+        price_per_day = price_per_hour * HOURS_IN_A_DAY
+        price_per_year = price_per_month * MONTHS_IN_A_YEAR
+        lifetime_cost = price_per_month * (np.asarray(hours_running, dtype=np.float64) / HOURS_IN_A_MONTH)
+
+        return [
+            {"hourly": hourly, "daily": daily, "monthly": monthly, "yearly": yearly, "lifetime": lifetime}
+            for hourly, daily, monthly, yearly, lifetime in zip(
+                price_per_hour.tolist(), price_per_day.tolist(), price_per_month.tolist(),
+                price_per_year.tolist(), lifetime_cost.tolist()
+            )
+        ]
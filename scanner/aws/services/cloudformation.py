@@ -1,11 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MIN_AGE_SECONDS, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import determine_metric_time_window, fetch_metric, determine_unused_reason
+from scanner.aws.utils.scanner_helper import determine_metric_time_window, fetch_metrics, determine_unused_reason, METRIC_PERIOD
 
 logger = get_logger(__name__)
 
+TERMINAL_STATES = frozenset({"DELETE_COMPLETE", "ROLLBACK_COMPLETE"})
+
 class CloudFormationScanner(ResourceScannerRegistry):
     """
     Scanner for CloudFormation stacks.
@@ -24,72 +27,101 @@ class CloudFormationScanner(ResourceScannerRegistry):
             cloudwatch_client = session.get_client("cloudwatch")
             stacks = cfn_client.describe_stacks()["Stacks"]
             unused_resources = []
+            active_stacks = []
             current_time = datetime.now(timezone.utc)
+            account_id = session.account_id
 
             for stack in stacks:
                 stack_name = stack["StackName"]
                 stack_status = stack["StackStatus"]
-                logger.debug(f"Processing stack: {stack_name} (Status: {stack_status})")
+                logger.debug("Processing stack: %s (Status: %s)", stack_name, stack_status)
 
-                if stack_status in ["DELETE_COMPLETE", "ROLLBACK_COMPLETE"]:
+                if stack_status in TERMINAL_STATES:
                     unused_resources.append({
                         "ResourceName": stack_name,
                         "ResourceId": stack_name,
                         "Reason": f"Stack is in terminal state ({stack_status}).",
-                        "AccountId": session.account_id,
+                        "AccountId": account_id,
                     })
                     continue
 
-                resources = cfn_client.list_stack_resources(StackName=stack_name)["StackResourceSummaries"]
-                for resource in resources:
-                    resource_id = resource["PhysicalResourceId"]
-                    resource_type = resource.get("ResourceType")
-                    resource_status = resource["ResourceStatus"]
+                # Newly created stacks have no metric history yet, so skip the resource and CloudWatch calls
+                if (current_time - stack["CreationTime"]).total_seconds() < MIN_AGE_SECONDS:
+                    logger.debug("Stack %s was created less than %s seconds ago, skipping.", stack_name, MIN_AGE_SECONDS)
+                    continue
+
+                active_stacks.append(stack)
+
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                # Retrieve the resources of every active stack concurrently
+                stack_resources = list(executor.map(
+                    lambda stack: self._list_stack_resources(cfn_client, stack["StackName"]), active_stacks
+                ))
 
-                    if resource_type != "AWS::EC2::Instance" or resource_status in ["DELETE_COMPLETE", "ROLLBACK_COMPLETE"]:
-                        continue
+                candidates = [
+                    (stack, resource)
+                    for stack, resources in zip(active_stacks, stack_resources)
+                    for resource in resources
+                    if resource.get("ResourceType") == "AWS::EC2::Instance"
+                    and resource["ResourceStatus"] not in TERMINAL_STATES
+                ]
 
-                    start_time = determine_metric_time_window(stack["CreationTime"], current_time, DAYS_THRESHOLD)
-                    resource_usage = self.check_instance_usage(cloudwatch_client, resource_id, start_time, current_time)
+                # Check the usage of every candidate instance concurrently
+                resource_usages = list(executor.map(
+                    lambda candidate: self._check_candidate_usage(cloudwatch_client, candidate, current_time), candidates
+                ))
 
-                    reason = resource_usage.get("reason")
-                    if reason:
-                        unused_resources.append({
-                            "ResourceName": stack_name,
-                            "ResourceId": resource_id,
-                            "ResourceType": resource_type,
-                            "Reason": reason,
-                        })
+            unused_resources.extend(
+                {
+                    "ResourceName": stack["StackName"],
+                    "ResourceId": resource["PhysicalResourceId"],
+                    "ResourceType": resource["ResourceType"],
+                    "Reason": resource_usage["reason"],
+                }
+                for (stack, resource), resource_usage in zip(candidates, resource_usages)
+                if resource_usage.get("reason")
+            )
 
-            logger.info(f"Found {len(unused_resources)} unused CloudFormation resources.")
+            logger.info("Found %s unused CloudFormation resources.", len(unused_resources))
             return unused_resources
         except Exception as e:
             logger.error(f"Error retrieving CloudFormation resources: {e}")
             return []
 
+    def _list_stack_resources(self, cfn_client, stack_name):
+        """Retrieve all resource summaries of a stack."""
+        paginator = cfn_client.get_paginator("list_stack_resources")
+        return [
+            resource
+            for page in paginator.paginate(StackName=stack_name)
+            for resource in page["StackResourceSummaries"]
+        ]
+
+    def _check_candidate_usage(self, cloudwatch_client, candidate, current_time):
+        """Check the usage of a (stack, resource) candidate over the metric window of its stack."""
+        stack, resource = candidate
+        start_time = determine_metric_time_window(stack["CreationTime"], current_time, DAYS_THRESHOLD)
+        return self.check_instance_usage(cloudwatch_client, resource["PhysicalResourceId"], start_time, current_time)
+
     def check_instance_usage(self, cloudwatch_client, instance_id, start_time, end_time):
         """Check the EC2 instance's usage metrics."""
         
-        # Fetch metrics using the new fetch_metric function (returns a list of values)
-        metrics = {
-            "cpu": fetch_metric(
-                cloudwatch_client, "AWS/EC2", instance_id, "InstanceId", "CPUUtilization", "Average", start_time, end_time
-            ),
-            "network": fetch_metric(
-                cloudwatch_client, "AWS/EC2", instance_id, "InstanceId", "NetworkPacketsIn", "Sum", start_time, end_time
-            ),
-        }
+        # Fetch both metrics with a single GetMetricData request; only whether they are zero is checked,
+        # so a single period spanning the whole window makes CloudWatch return one value for each
+        cpu, network = fetch_metrics(
+            cloudwatch_client, "AWS/EC2", instance_id, "InstanceId",
+            [("CPUUtilization", "Average"), ("NetworkPacketsIn", "Sum")],
+            start_time, end_time, max(DAYS_THRESHOLD * 86400, METRIC_PERIOD),
+        )
+        metrics = {"cpu": cpu, "network": network}
         
-        # Sum the values from the lists returned by fetch_metric
-        cpu_usage_total = sum(metrics["cpu"])  # Sum the CPU utilization values
-        network_usage_total = sum(metrics["network"])  # Sum the network packets in values
-
+        # Metric totals are only summed when the condition needing them is evaluated
         unused_conditions = [
-            (lambda m: (cpu_usage_total == 0, "No CPU usage detected.")),
-            (lambda m: (network_usage_total == 0, "No network activity detected.")),
+            ("No CPU usage detected.", lambda: metrics["cpu"].sum() == 0),
+            ("No network activity detected.", lambda: metrics["network"].sum() == 0),
         ]
         
-        reason = determine_unused_reason(metrics, unused_conditions)
+        reason = determine_unused_reason(unused_conditions)
         if reason:
             metrics["reason"] = reason
         
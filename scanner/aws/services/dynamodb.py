@@ -1,8 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MIN_AGE_SECONDS, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import determine_metric_time_window, fetch_metric, determine_unused_reason
+from scanner.aws.utils.scanner_helper import determine_metric_time_window, fetch_metrics, determine_unused_reason, METRIC_PERIOD
 
 logger = get_logger(__name__)
 
@@ -27,13 +28,22 @@ class DynamoDBScanner(ResourceScannerRegistry):
             unused_tables = []
             current_time = datetime.now(timezone.utc)
 
-            for table_name in tables:
-                logger.debug(f"Checking DynamoDB table {table_name} for usage...")
+            # Retrieve table metadata concurrently, describe_table is one round-trip per table
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                table_infos = list(executor.map(
+                    lambda name: dynamodb_client.describe_table(TableName=name)["Table"], tables
+                ))
+
+            for table_name, table_info in zip(tables, table_infos):
+                logger.debug("Checking DynamoDB table %s for usage...", table_name)
 
-                # Retrieve table metadata
-                table_info = dynamodb_client.describe_table(TableName=table_name)["Table"]
                 creation_time = table_info["CreationDateTime"]
 
+                # Newly created tables have no metric history yet, so skip the CloudWatch calls
+                if (current_time - creation_time).total_seconds() < MIN_AGE_SECONDS:
+                    logger.debug("DynamoDB table %s was created less than %s seconds ago, skipping.", table_name, MIN_AGE_SECONDS)
+                    continue
+
                 # Determine the start time for metrics
                 start_time = determine_metric_time_window(creation_time, current_time, DAYS_THRESHOLD)
 
@@ -50,9 +60,9 @@ class DynamoDBScanner(ResourceScannerRegistry):
                         "TableSizeBytes": table_info.get("TableSizeBytes", 0),
                         "Reason": reason,
                     })
-                    logger.debug(f"DynamoDB table {table_name} is unused or underutilized: {reason}")
+                    logger.debug("DynamoDB table %s is unused or underutilized: %s", table_name, reason)
 
-            logger.info(f"Found {len(unused_tables)} unused DynamoDB tables.")
+            logger.info("Found %s unused DynamoDB tables.", len(unused_tables))
             return unused_tables
         except Exception as e:
             logger.error(f"Error retrieving DynamoDB tables: {e}")
@@ -61,30 +71,32 @@ class DynamoDBScanner(ResourceScannerRegistry):
     def check_dynamodb_usage(self, cloudwatch_client, table_name, start_time, end_time):
         """Check the DynamoDB table's read/write capacity and throttled events metrics."""
         
-        # Fetch metrics using the updated fetch_metric function
+        # Fetch all three metrics with a single GetMetricData request; only their totals are checked,
+        # so a single period spanning the whole window makes CloudWatch return them directly
+        read_capacity, write_capacity, throttled_events = fetch_metrics(
+            cloudwatch_client, "AWS/DynamoDB", table_name, "TableName",
+            [
+                ("ConsumedReadCapacityUnits", "Sum"),
+                ("ConsumedWriteCapacityUnits", "Sum"),
+                ("ProvisionedThroughputExceededEvents", "Sum"),
+            ],
+            start_time, end_time, max(DAYS_THRESHOLD * 86400, METRIC_PERIOD),
+        )
         metrics = {
-            "read_capacity": fetch_metric(
-                cloudwatch_client, "AWS/DynamoDB", table_name, "TableName", "ConsumedReadCapacityUnits", "Sum", start_time, end_time
-            ),
-            "write_capacity": fetch_metric(
-                cloudwatch_client, "AWS/DynamoDB", table_name, "TableName", "ConsumedWriteCapacityUnits", "Sum", start_time, end_time
-            ),
-            "throttled_events": fetch_metric(
-                cloudwatch_client, "AWS/DynamoDB", table_name, "TableName", "ProvisionedThroughputExceededEvents", "Sum", start_time, end_time
-            ),
+            "read_capacity": read_capacity,
+            "write_capacity": write_capacity,
+            "throttled_events": throttled_events,
         }
 
-        # Process metrics
-        read_capacity_total = sum(metrics["read_capacity"])  # Summing the values from the list
-        write_capacity_total = sum(metrics["write_capacity"])  # Summing the values from the list
-        throttled_events_total = sum(metrics["throttled_events"])  # Summing the values from the list
-
+        # Metric totals are only summed when the condition needing them is evaluated
         unused_conditions = [
-            (lambda m: (read_capacity_total == 0 and write_capacity_total == 0, "No read or write activity.")),
-            (lambda m: (throttled_events_total > 0, f"Provisioned throughput exceeded events: {throttled_events_total}.")),
+            ("No read or write activity.",
+             lambda: metrics["read_capacity"].sum() == 0 and metrics["write_capacity"].sum() == 0),
+            (lambda: f"Provisioned throughput exceeded events: {metrics['throttled_events'].sum()}.",
+             lambda: metrics["throttled_events"].sum() > 0),
         ]
 
-        reason = determine_unused_reason(metrics, unused_conditions)
+        reason = determine_unused_reason(unused_conditions)
         if reason:
             metrics["reason"] = reason
         
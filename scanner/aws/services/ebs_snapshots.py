@@ -1,12 +1,24 @@
-from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError
 from utils.logger import get_logger
 from config.config import DAYS_THRESHOLD
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import calculate_and_format_age_in_time_units, extract_tag_value
+from scanner.aws.utils.scanner_helper import extract_tag_value, cached_describe, calculate_and_format_age_in_time_units
 from scanner.aws.cost_estimator import CostEstimator
 
 logger = get_logger(__name__)
 
+# Number of snapshot pages processed concurrently while the next page is being fetched
+PAGE_WORKERS = 4
+# EBS snapshots cannot predate this year, so start-time patterns do not need to reach further back
+FIRST_SNAPSHOT_YEAR = 2008
+THRESHOLD_REASON_TEMPLATE = "Snapshot has been unattached for {age}, exceeding the threshold of " + str(DAYS_THRESHOLD) + " days"
+DELETED_VOLUME_REASON_TEMPLATE = ", and its source volume {volume_id} no longer exists"
+# Volume ID AWS reports for snapshots that were not created from a volume (e.g. copied snapshots)
+PLACEHOLDER_VOLUME_ID = "vol-ffffffff"
+
 class EbsSnapshotScanner(ResourceScannerRegistry):
     """
     Scanner for EBS Snapshots.
@@ -22,51 +34,112 @@ class EbsSnapshotScanner(ResourceScannerRegistry):
         logger.debug("Retrieving EBS snapshots...")
         try:
             ec2_client = session.get_client("ec2")
-            snapshots = ec2_client.describe_snapshots(OwnerIds=["self"])["Snapshots"]
-            unused_snapshots = []
+            cost_estimator = CostEstimator()
             current_time = datetime.now(timezone.utc)
+            cutoff_time = current_time - timedelta(days=DAYS_THRESHOLD)
+            # The start-time filter only narrows snapshots down to whole days, so the exact cutoff is applied client-side
+            cutoff_ts = cutoff_time.timestamp()
+            existing_volume_ids = self._list_volume_ids(session, ec2_client)
+            unused_snapshots = []
+
+            with ThreadPoolExecutor(max_workers=PAGE_WORKERS) as executor:
+                in_flight = deque()
+                for snapshots in self._iter_snapshot_pages(ec2_client, cutoff_time):
+                    in_flight.append(executor.submit(
+                        self._filter_unused_snapshots, snapshots, cost_estimator, current_time, cutoff_ts, existing_volume_ids
+                    ))
+                    # Keep at most PAGE_WORKERS pages in memory at once
+                    if len(in_flight) >= PAGE_WORKERS:
+                        unused_snapshots.extend(in_flight.popleft().result())
+                while in_flight:
+                    unused_snapshots.extend(in_flight.popleft().result())
 
-            for snapshot in snapshots:
-                snapshot_id = snapshot["SnapshotId"]
-                logger.debug(f"Checking EBS snapshot {snapshot_id} for usage...")
-
-                # Retrieve snapshot description or tags for a name
-                snapshot_name = extract_tag_value(snapshot.get("Tags"), key="Name")
-                snapshot_description = snapshot.get("Description", "N/A")
-                create_time = snapshot["StartTime"]
-                size_in_gb = snapshot["VolumeSize"]
-
-                # Calculate snapshot age using the helper function
-                age = calculate_and_format_age_in_time_units(current_time, create_time)
-
-                # Estimate snapshot cost
-                cost_details = CostEstimator().calculate_cost(
-                    resource_type=self.label,
-                    resource_size=size_in_gb,
-                    hours_running=(current_time - create_time).total_seconds() / 3600,
-                )
-
-                # Mark snapshot as unused if older than threshold
-                days_since_creation = (current_time - create_time).days
-                if days_since_creation >= DAYS_THRESHOLD:
-                    tags = snapshot.get("Tags", [])
-                    snapshot_details = {
-                        "ResourceName": snapshot_name or snapshot_description,
-                        "ResourceId": snapshot_id,
-                        "Size": size_in_gb,
-                        "CreateTime": create_time,
-                        "Reason": f"Snapshot has been unattached for {age}, exceeding the threshold of {DAYS_THRESHOLD} days",
-                        "Cost": {self.label: cost_details},
-                        "Tags": tags  # Include tags in the output
-                    }
-                    unused_snapshots.append(snapshot_details)
-
-                    logger.debug(f"EBS snapshot[{snapshot_id}] cost: {cost_details}")
-                    logger.info(f"EBS snapshot {snapshot_id} ({snapshot_name or snapshot_description}) is unused.")
-
-            logger.info(f"Found {len(unused_snapshots)} unused EBS snapshots.")
+            logger.info("Found %s unused EBS snapshots.", len(unused_snapshots))
             return unused_snapshots
 
         except Exception as e:
             logger.error(f"Error retrieving EBS snapshots: {e}")
             return []
+
+    def _iter_snapshot_pages(self, ec2_client, cutoff_time):
+        """
+        Lazily yield the snapshots owned by the account that were started on or before the cutoff day, one page at a time.
+        Falls back to all owned snapshots if the start-time filter is rejected.
+        """
+        paginator = ec2_client.get_paginator("describe_snapshots")
+        filters = [{"Name": "start-time", "Values": self._start_time_filter_values(cutoff_time)}]
+        yielded = False
+        try:
+            for page in paginator.paginate(OwnerIds=["self"], Filters=filters, PaginationConfig={"PageSize": 1000}):
+                yielded = True
+                yield page["Snapshots"]
+        except ClientError as e:
+            # Retrying after pages were already processed would report their snapshots twice
+            if yielded:
+                raise
+            logger.warning("Snapshot start-time filter was rejected, filtering client-side instead: %s", e)
+            for page in paginator.paginate(OwnerIds=["self"], PaginationConfig={"PageSize": 1000}):
+                yield page["Snapshots"]
+
+    def _start_time_filter_values(self, cutoff_time):
+        """Build start-time wildcard patterns that match every day up to and including the cutoff day."""
+        values = [f"{year}-*" for year in range(FIRST_SNAPSHOT_YEAR, cutoff_time.year)]
+        values += [f"{cutoff_time.year}-{month:02d}-*" for month in range(1, cutoff_time.month)]
+        values += [f"{cutoff_time:%Y-%m}-{day:02d}*" for day in range(1, cutoff_time.day + 1)]
+        return values
+
+    def _list_volume_ids(self, session, ec2_client):
+        """Retrieve the IDs of all volumes in the region, shared with the EBS volume scanner."""
+        volumes = cached_describe(
+            ec2_client, "describe_volumes", "Volumes", (session.account_id, session.region_name), page_size=500
+        )
+        return {volume["VolumeId"] for volume in volumes}
+
+    def _filter_unused_snapshots(self, snapshots, cost_estimator, current_time, cutoff_ts, existing_volume_ids):
+        """Build records for the snapshots of a page that are older than the threshold."""
+        old_snapshots = [snapshot for snapshot in snapshots if snapshot["StartTime"].timestamp() <= cutoff_ts]
+        if not old_snapshots:
+            return []
+
+        # Every snapshot shares the same price per GB, so the costs of a page are computed in one call
+        current_ts = current_time.timestamp()
+        costs = cost_estimator.calculate_storage_costs(
+            self.label,
+            [snapshot["VolumeSize"] for snapshot in old_snapshots],
+            [(current_ts - snapshot["StartTime"].timestamp()) / 3600 for snapshot in old_snapshots],
+        )
+        return [
+            self._build_unused_snapshot(snapshot, cost_details, current_time, existing_volume_ids)
+            for snapshot, cost_details in zip(old_snapshots, costs)
+        ]
+
+    def _build_unused_snapshot(self, snapshot, cost_details, current_time, existing_volume_ids):
+        """Build the response for an unused EBS snapshot."""
+        snapshot_id = snapshot["SnapshotId"]
+        logger.debug("Checking EBS snapshot %s for usage...", snapshot_id)
+
+        # Retrieve snapshot description or tags for a name
+        tags = snapshot.get("Tags", [])
+        snapshot_name = extract_tag_value(tags, key="Name")
+        snapshot_description = snapshot.get("Description", "N/A")
+        create_time = snapshot["StartTime"]
+        size_in_gb = snapshot["VolumeSize"]
+
+        # Calculate snapshot age using the helper function
+        age = calculate_and_format_age_in_time_units(current_time, create_time)
+        reason = THRESHOLD_REASON_TEMPLATE.format(age=age)
+        volume_id = snapshot.get("VolumeId")
+        if volume_id and volume_id != PLACEHOLDER_VOLUME_ID and volume_id not in existing_volume_ids:
+            reason += DELETED_VOLUME_REASON_TEMPLATE.format(volume_id=volume_id)
+
+        logger.debug("EBS snapshot[%s] cost: %s", snapshot_id, cost_details)
+        logger.info("EBS snapshot %s (%s) is unused.", snapshot_id, snapshot_name or snapshot_description)
+        return {
+            "ResourceName": snapshot_name or snapshot_description,
+            "ResourceId": snapshot_id,
+            "Size": size_in_gb,
+            "CreateTime": create_time,
+            "Reason": reason,
+            "Cost": {self.label: cost_details},
+            "Tags": tags  # Include tags in the output
+        }
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from utils.logger import get_logger
 from config.config import DAYS_THRESHOLD
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import extract_tag_value,calculate_and_format_age_in_time_units
+from scanner.aws.utils.scanner_helper import extract_tag_value, cached_describe, calculate_and_format_age_in_time_units
 from scanner.aws.cost_estimator import CostEstimator
 
 logger = get_logger(__name__)
@@ -22,45 +22,53 @@ class EbsVolumeScanner(ResourceScannerRegistry):
         logger.debug("Retrieving EBS volumes...")
         try:
             ec2_client = session.get_client("ec2")
-            volumes = ec2_client.describe_volumes()["Volumes"]
+            # Shared with the EBS snapshot scanner, which checks snapshots against the same volumes
+            volumes = cached_describe(
+                ec2_client, "describe_volumes", "Volumes", (session.account_id, session.region_name), page_size=500
+            )
             unused_volumes = []
             current_time = datetime.now(timezone.utc)
+            cost_estimator = CostEstimator()
 
             for volume in volumes:
                 volume_id = volume["VolumeId"]
-                logger.debug(f"Checking EBS volume {volume_id} for usage...")
+                logger.debug("Checking EBS volume %s for usage...", volume_id)
 
                 # Retrieve volume name using helper function
                 volume_name = extract_tag_value(volume.get("Tags"), key="Name")
                 # Check if the volume is unattached
                 if not volume["Attachments"]:
                     create_time = volume["CreateTime"]
+                    age_delta = current_time - create_time
+                    days_since_creation = age_delta.days
+
+                    # Only volumes older than the threshold need an age string and cost estimate
+                    if days_since_creation < DAYS_THRESHOLD:
+                        continue
+
                     # Calculate snapshot age using the helper function
                     age = calculate_and_format_age_in_time_units(current_time, create_time)
-                    days_since_creation = (current_time - create_time).days
-                     # Calculate age in hours
-                    age_in_hours = int((current_time - create_time).total_seconds() / 3600)
-                    cost_details = CostEstimator().calculate_cost(
+                    # Calculate age in whole hours from the same delta
+                    age_in_hours = days_since_creation * 24 + age_delta.seconds // 3600
+                    cost_details = cost_estimator.calculate_cost(
                         resource_type=self.label,
                         resource_size=volume["Size"],
                         hours_running=age_in_hours
                     )
 
-                    # Mark volume as unused if it's older than the threshold
-                    if days_since_creation >= DAYS_THRESHOLD:
-                        unused_volumes.append({
-                            "ResourceName": volume_name,
-                            "ResourceId": volume_id,
-                            "State": volume["State"],
-                            "Size": volume["Size"],  # Size in GiB
-                            "CreateTime": create_time,
-                            "Reason": f"Volume has been unattached for {age}, exceeding the threshold of {DAYS_THRESHOLD} days",
-                            "Cost": {self.label: cost_details}
-                        })
-                        logger.debug(f"EBS volume[{volume_id}] cost: {cost_details}")
-                        logger.info(f"EBS volume {volume_id} ({volume_name}) is unused.")
+                    unused_volumes.append({
+                        "ResourceName": volume_name,
+                        "ResourceId": volume_id,
+                        "State": volume["State"],
+                        "Size": volume["Size"],  # Size in GiB
+                        "CreateTime": create_time,
+                        "Reason": f"Volume has been unattached for {age}, exceeding the threshold of {DAYS_THRESHOLD} days",
+                        "Cost": {self.label: cost_details}
+                    })
+                    logger.debug("EBS volume[%s] cost: %s", volume_id, cost_details)
+                    logger.info("EBS volume %s (%s) is unused.", volume_id, volume_name)
 
-            logger.info(f"Found {len(unused_volumes)} unused EBS volumes.")
+            logger.info("Found %s unused EBS volumes.", len(unused_volumes))
             return unused_volumes
 
         except Exception as e:
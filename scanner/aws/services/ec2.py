@@ -1,14 +1,38 @@
+import re
+from itertools import chain
 from datetime import datetime, timedelta, timezone
-from dateutil import parser
+import numpy as np
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MIN_AGE_SECONDS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import extract_tag_value, fetch_metric, calculate_and_format_age_in_time_units
+from scanner.aws.utils.scanner_helper import (
+    extract_tag_value, build_metric_query, cached_describe, fetch_metrics_batch, calculate_and_format_age_in_time_units,
+    METRIC_PERIOD
+)
 from scanner.aws.cost_estimator import CostEstimator
-import numpy as np
 
 logger = get_logger(__name__)
 
+# Instance states that can be reported; pending, shutting-down and terminated instances never stay long enough to qualify
+REPORTABLE_STATES = ["running", "stopped", "stopping"]
+# Fixed format of the timestamp AWS appends to StateTransitionReason, e.g. "User initiated (2024-01-31 12:00:00 GMT)"
+STATE_TRANSITION_TIME_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
+STATE_TRANSITION_TIME_PATTERN = re.compile(r"\(([^)]+)\)")
+
+# (query id prefix, namespace, dimension name, metric name, stat) of the metrics used to assess instance usage
+LOW_CPU_THRESHOLD = 2  # Average CPU percentage below which an instance is considered idle
+CPU_METRICS = (
+    ("cpu", "AWS/EC2", "InstanceId", "CPUUtilization", "Average"),
+)
+ACTIVITY_METRICS = (
+    ("net_in", "AWS/EC2", "InstanceId", "NetworkPacketsIn", "Sum"),
+    ("net_out", "AWS/EC2", "InstanceId", "NetworkPacketsOut", "Sum"),
+    ("ebs_read", "AWS/EBS", "VolumeId", "VolumeReadOps", "Sum"),
+    ("ebs_write", "AWS/EBS", "VolumeId", "VolumeWriteOps", "Sum"),
+)
+USAGE_METRICS = CPU_METRICS + ACTIVITY_METRICS
+COST_TYPES = ("hourly", "daily", "monthly", "yearly", "lifetime")
+
 class Ec2Scanner(ResourceScannerRegistry):
     """
     Scanner for EC2 Instances.
@@ -24,191 +48,215 @@ class Ec2Scanner(ResourceScannerRegistry):
         """Retrieve EC2 instances and flag them if they are underutilized, unused, or in a non-running state."""
         logger.debug("Retrieving EC2 instances...")
         try:
-            instances = session.get_client("ec2").describe_instances()["Reservations"]
+            ec2_client = session.get_client("ec2")
+            cloudwatch_client = session.get_client("cloudwatch")
+            # Look attached volumes up locally instead of calling describe_volumes for each of them
+            volumes_by_id = {
+                volume["VolumeId"]: volume
+                for volume in cached_describe(
+                    ec2_client, "describe_volumes", "Volumes", (session.account_id, session.region_name), page_size=500
+                )
+            }
+            paginator = ec2_client.get_paginator("describe_instances")
+            pages = paginator.paginate(
+                Filters=[{"Name": "instance-state-name", "Values": REPORTABLE_STATES}],
+                PaginationConfig={"PageSize": 1000},
+            )
+            # Stream instances page by page instead of loading them all at once
+            instances = chain.from_iterable(
+                reservation["Instances"] for page in pages for reservation in page["Reservations"]
+            )
             unused_instances = []
+            running_instances = []
             current_time = datetime.now(timezone.utc)
 
-            for reservation in instances:
-                for instance in reservation["Instances"]:
+            for instance in instances:
+                instance_id = instance["InstanceId"]
+                instance_state = instance["State"]["Name"]
+                launch_time = instance["LaunchTime"]
+                hours_since_launch = self._calculate_running_hours(launch_time, current_time)
+                logger.debug("Processing EC2 instance %s with state %s...", instance_id, instance_state)
+                tags = instance.get("Tags")
+                # Retrieve instance name and class
+                instance_name = extract_tag_value(tags, key="Name")
+                instance_class = instance.get("InstanceType", "Unknown")
+
+                # Check if the instance is stopped
+                if instance_state == "stopped":
+                    stopped_duration = self._calculate_stopped_duration(instance.get("StateTransitionReason"), current_time)
+
+                    if stopped_duration and (hours_since_launch / 24) >= DAYS_THRESHOLD:
+                        # Refactored to include days greater than threshold message
+                        reason = f"Stopped for {stopped_duration}, greater than {DAYS_THRESHOLD} days"
+                        ebs_details = self._get_ebs_volumes(volumes_by_id, instance, hours_since_launch)
+                        cost_data = self._calculate_combined_costs(ebs_details=ebs_details, hours_running=hours_since_launch)
+                        unused_instances.append(self._build_unused_instance_response(
+                            instance, instance_name, instance_class, tags, [reason],
+                            ebs_details=ebs_details, cost_data=cost_data
+                        ))
+                        logger.info("EC2 instance %s (%s) is unused: %s", instance_id, instance_name, reason)
+                    continue
+
+                # Check for non-running instances
+                if instance_state != "running":
+                    state_change_duration = self._calculate_state_change_duration(instance, current_time)
+
+                    if state_change_duration and state_change_duration >= DAYS_THRESHOLD:
+                        ebs_details = self._get_ebs_volumes(volumes_by_id, instance, hours_since_launch)
+                        cost_data = self._calculate_combined_costs(ebs_details=ebs_details, hours_running=hours_since_launch)
+                        unused_instances.append(self._build_unused_instance_response(
+                            instance, instance_name, instance_class, tags, ["Non-running state"],
+                            ebs_details=ebs_details, cost_data=cost_data
+                        ))
+                        logger.info("EC2 instance %s (%s) is in a non-running state: %s for %s days", instance_id, instance_name, instance_state, state_change_duration)
+                    continue
+
+                # Check if instance has been running long enough before checking for underutilization
+                running_duration = (current_time - launch_time).days
+
+                # Instances younger than MIN_AGE_SECONDS have no metric history yet, even with a zero-day threshold
+                if running_duration >= DAYS_THRESHOLD and hours_since_launch * 3600 >= MIN_AGE_SECONDS:
+                    # Running instances are analyzed together once all instances have been seen
+                    running_instances.append((instance, instance_name, instance_class, tags, hours_since_launch))
+                else:
+                    logger.debug("EC2 instance %s (%s) has been running for %s days, skipping underutilization check.", instance_id, instance_name, running_duration)
+
+            if running_instances:
+                usage_by_instance = self._check_instances_usage_batched(
+                    cloudwatch_client, [instance for instance, *_ in running_instances], current_time, CPU_METRICS
+                )
+                # Busy instances are not underutilized, so only the idle ones need their activity metrics
+                busy_mask = self._busy_cpu_mask(
+                    [usage_by_instance[instance["InstanceId"]]["cpu"] for instance, *_ in running_instances]
+                )
+                idle_instances = [
+                    instance for (instance, *_), busy in zip(running_instances, busy_mask) if not busy
+                ]
+                activity_by_instance = self._check_instances_usage_batched(
+                    cloudwatch_client, idle_instances, current_time, ACTIVITY_METRICS
+                )
+                for instance, instance_name, instance_class, tags, hours_since_launch in running_instances:
                     instance_id = instance["InstanceId"]
-                    instance_state = instance["State"]["Name"]
-                    launch_time = instance["LaunchTime"]
-                    hours_since_launch = self._calculate_running_hours(instance["LaunchTime"])
-                    logger.debug(f"Processing EC2 instance {instance_id} with state {instance_state}...")
-                    tags = instance.get("Tags")
-                    # Retrieve instance name and class
-                    instance_name = extract_tag_value(tags, key="Name")
-                    instance_class = instance.get("InstanceType", "Unknown")
-
-                    # Check if the instance is stopped
-                    if instance_state == "stopped":
-                        params = {
-                            "state_transition_reason": instance.get("StateTransitionReason"),
-                            "current_time": current_time
-                        }
-                        stopped_duration = self._calculate_stopped_duration(params)
-
-                        if stopped_duration and (hours_since_launch / 24) >= DAYS_THRESHOLD:
-                            # Refactored to include days greater than threshold message
-                            reason = f"Stopped for {stopped_duration}, greater than {DAYS_THRESHOLD} days"
-                            ebs_details = self._get_ebs_volumes(session, instance)
-                            hours_running = 0  # No running hours for stopped instances
-                            cost_data = self._calculate_combined_costs(ebs_details=ebs_details, hours_running=hours_since_launch)
-                            params = {
-                                "instance": instance,
-                                "instance_name": instance_name,
-                                "instance_class": instance_class,
-                                "tags": tags,
-                                "reasons": [reason],
-                                "session": session,
-                                "stopped_duration": stopped_duration,
-                                "ebs_details": ebs_details,
-                                "cost_data": cost_data
-                            }
-                            unused_instances.append(self._build_unused_instance_response(params))
-                            logger.info(f"EC2 instance {instance_id} ({instance_name}) is unused: {reason}")
+                    if instance_id not in activity_by_instance:
+                        logger.debug("EC2 instance %s (%s) has high CPU usage, skipping network and disk checks.", instance_id, instance_name)
                         continue
-
-                    # Check for non-running instances
-                    if instance_state != "running":
-                        params = {
-                            "instance": instance,
-                            "current_time": current_time
-                        }
-                        state_change_duration = self._calculate_state_change_duration(params)
-
-                        if state_change_duration and state_change_duration >= DAYS_THRESHOLD:
-                            ebs_details = self._get_ebs_volumes(session, instance)
-                            hours_running = 0  # No running hours for non-running instances
-                            cost_data = self._calculate_combined_costs(ebs_details=ebs_details, hours_running=hours_since_launch)
-                            params = {
-                                "instance": instance,
-                                "instance_name": instance_name,
-                                "instance_class": instance_class,
-                                "tags": tags,
-                                "reasons": ["Non-running state"],
-                                "session": session,
-                                "state_change_duration": state_change_duration,
-                                "ebs_details": ebs_details,
-                                "cost_data": cost_data
-                            }
-                            unused_instances.append(self._build_unused_instance_response(params))
-                            logger.info(f"EC2 instance {instance_id} ({instance_name}) is in a non-running state: {instance_state} for {state_change_duration} days")
-                        continue
-
-                    # Check if instance has been running long enough before checking for underutilization
-                    running_duration = (current_time - launch_time).days
-
-                    if running_duration >= DAYS_THRESHOLD:
-                        # Analyze running instances for underutilization
-                        params = {
-                            "session": session,
-                            "instance": instance,
-                            "current_time": current_time
-                        }
-                        reasons = self._analyze_instance_usage(params)
-                        if reasons:  # Only log if there are reasons
-                            hours_running = self._calculate_running_hours(launch_time)
-                            ebs_details = self._get_ebs_volumes(session, instance)
-                            cost_data = self._calculate_combined_costs(
-                                ebs_details=ebs_details, instance_class=instance_class, hours_running=hours_since_launch
-                            )
-                            params = {
-                                "instance": instance,
-                                "tags": tags,
-                                "instance_name": instance_name,
-                                "instance_class": instance_class,
-                                "reasons": reasons,
-                                "session": session,
-                                "hours_running": hours_running,
-                                "ebs_details": ebs_details,
-                                "cost_data": cost_data
-                            }
-                            unused_instances.append(self._build_unused_instance_response(params))
-                            logger.info(f"EC2 instance {instance_id} ({instance_name}) is underutilized: {', '.join(reasons)}")
-                    else:
-                        logger.debug(f"EC2 instance {instance_id} ({instance_name}) has been running for {running_duration} days, skipping underutilization check.")
-
-            logger.info(f"Found {len(unused_instances)} unused or underutilized EC2 instances.")
+                    # Analyze running instances for underutilization
+                    reasons = self._analyze_instance_usage({**usage_by_instance[instance_id], **activity_by_instance[instance_id]})
+                    if reasons:  # Only log if there are reasons
+                        ebs_details = self._get_ebs_volumes(volumes_by_id, instance, hours_since_launch)
+                        cost_data = self._calculate_combined_costs(
+                            ebs_details=ebs_details, instance_class=instance_class, hours_running=hours_since_launch
+                        )
+                        unused_instances.append(self._build_unused_instance_response(
+                            instance, instance_name, instance_class, tags, reasons,
+                            hours_running=hours_since_launch, ebs_details=ebs_details, cost_data=cost_data
+                        ))
+                        logger.info("EC2 instance %s (%s) is underutilized: %s", instance["InstanceId"], instance_name, ', '.join(reasons))
+
+            logger.info("Found %s unused or underutilized EC2 instances.", len(unused_instances))
             return unused_instances
         except Exception as e:
             logger.exception(f"Error retrieving EC2 instances: {e}")
             return []
 
-    def _calculate_state_change_duration(self, params):
+    def _calculate_state_change_duration(self, instance, current_time):
         """Calculate the duration the instance has been in a non-running state (e.g., 'stopped', 'terminated')."""
-        instance = params["instance"]
-        current_time = params["current_time"]
-        state_transition_reason = instance.get("StateTransitionReason")
-        if not state_transition_reason or "(" not in state_transition_reason or ")" not in state_transition_reason:
+        state_change_time = self._parse_state_transition_time(instance.get("StateTransitionReason"))
+        if state_change_time is None:
             return None
+        return (current_time - state_change_time).days
 
-        try:
-            timestamp_str = state_transition_reason.split("(")[-1].strip(")")
-            state_change_time = parser.parse(timestamp_str).astimezone(timezone.utc)
-            return (current_time - state_change_time).days
-        except Exception as e:
-            logger.warning(f"Could not parse timestamp from {state_transition_reason}: {e}")
-            return None
-
-    def _calculate_stopped_duration(self, params):
+    def _calculate_stopped_duration(self, state_transition_reason, current_time):
         """Calculate the stopped duration based on the state transition reason."""
-        state_transition_reason = params["state_transition_reason"]
-        current_time = params["current_time"]
         return self._parse_state_transition_reason(state_transition_reason, current_time)
 
     def _parse_state_transition_reason(self, state_transition_reason, current_time):
         """Parse the StateTransitionReason string and calculate the stopped duration."""
-        if not state_transition_reason or "(" not in state_transition_reason or ")" not in state_transition_reason:
+        stopped_time = self._parse_state_transition_time(state_transition_reason)
+        if stopped_time is None:
+            return None
+        return calculate_and_format_age_in_time_units(current_time, stopped_time)
+
+    def _parse_state_transition_time(self, state_transition_reason):
+        """Extract the UTC timestamp in parentheses from a StateTransitionReason string, or None if there is none."""
+        matches = STATE_TRANSITION_TIME_PATTERN.findall(state_transition_reason or "")
+        if not matches:
             return None
 
+        timestamp_str = matches[-1]
+        try:
+            return datetime.strptime(timestamp_str, STATE_TRANSITION_TIME_FORMAT).replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
         try:
-            timestamp_str = state_transition_reason.split("(")[-1].strip(")")
-            stopped_time = parser.parse(timestamp_str).astimezone(timezone.utc)
-            age = calculate_and_format_age_in_time_units(current_time, stopped_time)
-            return age
+            # Fall back to the slower generic parser for timestamps not in the usual format, imported only when needed
+            from dateutil import parser as date_parser
+            state_change_time = date_parser.parse(timestamp_str)
+            if state_change_time.tzinfo is None:
+                return state_change_time.replace(tzinfo=timezone.utc)
+            return state_change_time.astimezone(timezone.utc)
         except Exception as e:
-            logger.warning(f"Could not parse timestamp from {state_transition_reason}: {e}")
+            logger.warning("Could not parse timestamp from %s: %s", state_transition_reason, e)
             return None
 
 
-    def _analyze_instance_usage(self, params):
-        """Analyze EC2 instance usage for underutilization over the last DAYS_THRESHOLD days."""
-        session = params["session"]
-        instance = params["instance"]
-        current_time = params["current_time"]
-
-        launch_time = instance["LaunchTime"]
-        days_since_launch = (current_time - launch_time).days
-        start_time = launch_time if days_since_launch < DAYS_THRESHOLD else current_time - timedelta(days=DAYS_THRESHOLD)
-
-        instance_id = instance["InstanceId"]
-        cloudwatch_client = session.get_client("cloudwatch")
-
-        # Fetch CPU Usage (list of values over the last DAYS_THRESHOLD days)
-        cpu_usage = fetch_metric(cloudwatch_client, "AWS/EC2", instance_id, "InstanceId", "CPUUtilization", "Average", start_time, current_time)
-
-        # Fetch Network Traffic (list of values for NetworkPacketsIn and NetworkPacketsOut)
-        network_in = fetch_metric(cloudwatch_client, "AWS/EC2", instance_id, "InstanceId", "NetworkPacketsIn", "Sum", start_time, current_time)
-        network_out = fetch_metric(cloudwatch_client, "AWS/EC2", instance_id, "InstanceId", "NetworkPacketsOut", "Sum", start_time, current_time)
+    def _busy_cpu_mask(self, cpu_series):
+        """Return a boolean array flagging the instances whose average CPU usage is at or above LOW_CPU_THRESHOLD."""
+        counts = np.fromiter((len(values) for values in cpu_series), dtype=np.int64, count=len(cpu_series))
+        # Sum every instance's datapoints in one pass over the concatenated values instead of one reduction per instance
+        totals = np.bincount(
+            np.repeat(np.arange(len(cpu_series)), counts), weights=np.concatenate(cpu_series), minlength=len(cpu_series)
+        )
+        averages = np.divide(totals, counts, out=np.zeros(len(cpu_series)), where=counts > 0)
+        return (counts > 0) & (averages >= LOW_CPU_THRESHOLD)
+
+    def _check_instances_usage_batched(self, cloudwatch_client, instances, current_time, usage_metrics=USAGE_METRICS):
+        """Fetch the given usage metrics of all the given instances over the last DAYS_THRESHOLD days in batched requests."""
+        if not instances:
+            return {}
+        # Only instances running for at least DAYS_THRESHOLD days are analyzed, so they all share the same window.
+        # A single period spanning the whole window makes CloudWatch return the summary statistic instead of hourly
+        # values; the window is aligned to whole hours, as CloudWatch rounds older start times down to the hour, so it
+        # is exactly one period long and no second datapoint covering a few minutes comes back
+        window_period = max(DAYS_THRESHOLD * 86400, METRIC_PERIOD)
+        end_time = current_time.replace(minute=0, second=0, microsecond=0)
+        start_time = end_time - timedelta(seconds=window_period)
+        metric_queries = [
+            build_metric_query(
+                f"{prefix}_{index}", namespace, metric_name, [{"Name": dimension_name, "Value": instance["InstanceId"]}], stat,
+                period=window_period
+            )
+            for index, instance in enumerate(instances)
+            for prefix, namespace, dimension_name, metric_name, stat in usage_metrics
+        ]
+        values_by_id = fetch_metrics_batch(cloudwatch_client, metric_queries, start_time, end_time)
+        return {
+            # Metrics whose request failed are analyzed like metrics without data, which flag nothing
+            instance["InstanceId"]: {prefix: values_by_id.get(f"{prefix}_{index}", np.zeros(0)) for prefix, *_ in usage_metrics}
+            for index, instance in enumerate(instances)
+        }
 
-        # Fetch Disk I/O (list of values for VolumeReadOps and VolumeWriteOps)
-        ebs_read_ops = fetch_metric(cloudwatch_client, "AWS/EBS", instance_id, "VolumeId", "VolumeReadOps", "Sum", start_time, current_time)
-        ebs_write_ops = fetch_metric(cloudwatch_client, "AWS/EBS", instance_id, "VolumeId", "VolumeWriteOps", "Sum", start_time, current_time)
+    def _analyze_instance_usage(self, metrics):
+        """Analyze EC2 instance usage metrics for underutilization over the last DAYS_THRESHOLD days."""
+        cpu_usage = metrics["cpu"]
+        network_in = metrics["net_in"]
+        network_out = metrics["net_out"]
+        ebs_read_ops = metrics["ebs_read"]
+        ebs_write_ops = metrics["ebs_write"]
 
         # Analyze metrics to assess usage over the last DAYS_THRESHOLD days
         reasons = []
 
         # CPU Usage Analysis (e.g., low CPU usage)
         if len(cpu_usage) > 0:
-            cpu_avg = np.mean(cpu_usage)  # Calculate the average CPU usage over the period
-            if cpu_avg < 2:  # Example threshold for low CPU usage
+            cpu_avg = cpu_usage.mean()  # Calculate the average CPU usage over the period
+            if cpu_avg < LOW_CPU_THRESHOLD:
                 reasons.append(f"Low CPU usage: {cpu_avg:.2f}% average over the last {DAYS_THRESHOLD} days")
 
         # Network Traffic Analysis (e.g., low network traffic could indicate underutilization)
         if len(network_in) > 0 and len(network_out) > 0:
-            network_in_sum = sum(network_in)  # Sum of all incoming packets over the period
-            network_out_sum = sum(network_out)  # Sum of all outgoing packets over the period
+            network_in_sum = network_in.sum()  # Sum of all incoming packets over the period
+            network_out_sum = network_out.sum()  # Sum of all outgoing packets over the period
 
             # Threshold for low network traffic (e.g., less than 1 million packets)
             if network_in_sum < 1_000_000 and network_out_sum < 1_000_000:
@@ -216,8 +264,8 @@ class Ec2Scanner(ResourceScannerRegistry):
 
         # Disk I/O Analysis (e.g., low disk operations)
         if len(ebs_read_ops) > 0 and len(ebs_write_ops) > 0:
-            ebs_read_ops_sum = sum(ebs_read_ops)  # Sum of all read operations
-            ebs_write_ops_sum = sum(ebs_write_ops)  # Sum of all write operations
+            ebs_read_ops_sum = ebs_read_ops.sum()  # Sum of all read operations
+            ebs_write_ops_sum = ebs_write_ops.sum()  # Sum of all write operations
 
             # Threshold for low disk I/O (e.g., less than 1000 operations)
             if ebs_read_ops_sum < 1000 and ebs_write_ops_sum < 1000:
@@ -227,10 +275,8 @@ class Ec2Scanner(ResourceScannerRegistry):
         return reasons
 
 
-    def _calculate_running_hours(self, launch_time):
-        """Calculate the number of hours the instance has been running."""
-        current_time = datetime.now(timezone.utc)
-
+    def _calculate_running_hours(self, launch_time, current_time):
+        """Calculate the number of hours the instance has been running as of current_time."""
         # Ensure launch_time is in UTC if it's a naive datetime object
         if launch_time.tzinfo is None:
             launch_time = launch_time.replace(tzinfo=timezone.utc)  # If launch_time has no timezone, set it to UTC
@@ -241,22 +287,20 @@ class Ec2Scanner(ResourceScannerRegistry):
 
         # Guard against future launch times
         if current_time < launch_time:
-            logger.warning(f"Instance launch time is in the future: {launch_time}. Setting running hours to 0.")
+            logger.warning("Instance launch time is in the future: %s. Setting running hours to 0.", launch_time)
             return 0
 
         # Calculate the running duration and convert it to hours
         running_duration = current_time - launch_time
         return max(running_duration.total_seconds() / 3600, 0)  # Convert seconds to hours and ensure no negative values
 
-    def _get_ebs_volumes(self, session, instance):
-        """Get the EBS volume types and sizes associated with the EC2 instance."""
+    def _get_ebs_volumes(self, volumes_by_id, instance, hours_running):
+        """Get the EBS volume types and sizes associated with the EC2 instance, running for hours_running hours."""
         ebs_details = []
-        hours_running = self._calculate_running_hours(instance.get("LaunchTime"))
         for block_device in instance.get("BlockDeviceMappings", []):
             if "Ebs" in block_device:
                 volume_id = block_device["Ebs"]["VolumeId"]
-                ebs_client = session.get_client("ec2")
-                volume = ebs_client.describe_volumes(VolumeIds=[volume_id])["Volumes"][0]
+                volume = volumes_by_id.get(volume_id, {})
                 volume_type = volume.get("VolumeType", "Unknown")
                 volume_size = volume.get("Size", 0)  # Size in GB
                 ebs_details.append({"VolumeId": volume_id, "VolumeType": volume_type, "SizeGB": volume_size, "HoursRunning": hours_running})
@@ -264,43 +308,31 @@ class Ec2Scanner(ResourceScannerRegistry):
 
     def _calculate_combined_costs(self, instance_class=None, hours_running=None, ebs_details=None):
         """Calculate combined costs for an EC2 instance and its associated EBS volumes."""
-        # Initialize total costs
-        total_costs = {
-            "hourly": 0,
-            "daily": 0,
-            "monthly": 0,
-            "yearly": 0,
-            "lifetime": 0,
-        }
+        costs = []
         # Add EC2 instance costs if applicable
         if instance_class and hours_running is not None:
-            ec2_cost_data = self.cost_estimator.calculate_cost(self.label, resource_size=instance_class, hours_running=hours_running)
-            for cost_type in total_costs:
-                total_costs[cost_type] += ec2_cost_data.get(cost_type, 0)
+            costs.append(self.cost_estimator.calculate_cost(self.label, resource_size=instance_class, hours_running=hours_running))
 
-        # Add EBS volume costs if provided
+        # Add EBS volume costs if provided, all priced with a single lookup
         if ebs_details and hours_running is not None:
-            for ebs in ebs_details:
-                ebs_cost_data = self.cost_estimator.calculate_cost("EBS Volumes", resource_size=ebs["SizeGB"], hours_running=hours_running)
-                for cost_type in total_costs:
-                    total_costs[cost_type] += ebs_cost_data.get(cost_type, 0)
+            costs.extend(self.cost_estimator.calculate_storage_costs(
+                "EBS Volumes", [ebs["SizeGB"] for ebs in ebs_details], hours_running
+            ))
 
-        logger.debug(f"{self.label} Cost: {total_costs}")
+        # Sum every cost breakdown at once, skipping the ones whose price is unavailable
+        cost_matrix = np.array(
+            [[cost.get(cost_type, 0) for cost_type in COST_TYPES] for cost in costs if cost], dtype=np.float64
+        ).reshape(-1, len(COST_TYPES))
+        total_costs = dict(zip(COST_TYPES, cost_matrix.sum(axis=0).tolist()))
+
+        logger.debug("%s Cost: %s", self.label, total_costs)
         return {self.label: total_costs}
 
 
 
-    def _build_unused_instance_response(self, params):
+    def _build_unused_instance_response(self, instance, instance_name, instance_class, tags, reasons,
+                                        hours_running=None, ebs_details=None, cost_data=None):
         """Build the response for an unused or underutilized EC2 instance."""
-        instance = params["instance"]
-        instance_name = params["instance_name"]
-        instance_class = params["instance_class"]
-        reasons = params["reasons"]
-        tags = params["tags"]
-        hours_running = params.get("hours_running")
-        ebs_details = params.get("ebs_details")
-        cost_data = params.get("cost_data")
-
         # Ensure 'reasons' is always a list, even if None or empty
         if not isinstance(reasons, list):
             reasons = []  # Default to an empty list if 'reasons' is not iterable
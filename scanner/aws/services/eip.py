@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from utils.logger import get_logger
 from config.config import DAYS_THRESHOLD
@@ -22,22 +23,28 @@ class EipScanner(ResourceScannerRegistry):
         logger.debug("Retrieving unused Elastic IPs...")
         try:
             ec2_client = session.get_client("ec2")
-            addresses = ec2_client.describe_addresses()["Addresses"]
+            # Both listings are independent network round-trips, so the NAT Gateways are listed while the addresses are described
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                nat_allocation_ids_future = executor.submit(self._get_nat_gateway_allocation_ids, ec2_client)
+                addresses = ec2_client.describe_addresses()["Addresses"]
+                nat_allocation_ids = nat_allocation_ids_future.result()
             unused_ips = []
+            cost_details = None
 
             for addr in addresses:
                 allocation_id = addr.get("AllocationId")
                 public_ip = addr.get("PublicIp")
-                logger.debug(f"Checking Elastic IP {public_ip} for usage...")
+                logger.debug("Checking Elastic IP %s for usage...", public_ip)
 
                 # Check if the Elastic IP is not associated with any resource
                 if "InstanceId" not in addr and "NetworkInterfaceId" not in addr:
-                    if not self._check_nat_gateway_association(ec2_client, allocation_id):
-                        # Calculate the cost of unused Elastic IP
-                        cost_details = CostEstimator().calculate_cost(
-                            resource_type=self.label,
-                            hours_running=0  # Assuming unused IPs haven't been running for any hours
-                        )
+                    if allocation_id not in nat_allocation_ids:
+                        # Calculate the cost of an unused Elastic IP once, it is the same for every address
+                        if cost_details is None:
+                            cost_details = CostEstimator().calculate_cost(
+                                resource_type=self.label,
+                                hours_running=0  # Assuming unused IPs haven't been running for any hours
+                            )
 
                         unused_ips.append({
                             "ResourceId": allocation_id,
@@ -46,32 +53,27 @@ class EipScanner(ResourceScannerRegistry):
                             "Reason": "Not associated with any resource (EC2 Instance, Network Interface, or NAT Gateway).",
                             "Cost": {self.label: cost_details}
                         })
-                        logger.debug(f"Elastic IP {public_ip} is unused and added to the list. Cost: {cost_details}")
+                        logger.debug("Elastic IP %s is unused and added to the list. Cost: %s", public_ip, cost_details)
 
-            logger.info(f"Found {len(unused_ips)} unused Elastic IPs.")
+            logger.info("Found %s unused Elastic IPs.", len(unused_ips))
             return unused_ips
 
         except Exception as e:
             logger.error(f"Error retrieving Elastic IPs: {e}")
             return []
     
-    def _check_nat_gateway_association(self, ec2_client, allocation_id):
-        """Check if an Elastic IP is associated with a NAT Gateway."""
-        if not allocation_id:
-            logger.debug("No Allocation ID provided for NAT Gateway association check.")
-            return False
-
-        logger.debug(f"Checking NAT Gateway association for Allocation ID {allocation_id}...")
+    def _get_nat_gateway_allocation_ids(self, ec2_client):
+        """Retrieve the Allocation IDs of all Elastic IPs associated with a NAT Gateway."""
+        logger.debug("Retrieving NAT Gateway associations...")
         try:
-            nat_gateways = ec2_client.describe_nat_gateways()["NatGateways"]
-
-            for nat_gateway in nat_gateways:
-                for address in nat_gateway.get("NatGatewayAddresses", []):
-                    if address.get("AllocationId") == allocation_id:
-                        logger.debug(f"Elastic IP with Allocation ID {allocation_id} is associated with NAT Gateway {nat_gateway['NatGatewayId']}.")
-                        return True
-
-            return False
+            paginator = ec2_client.get_paginator("describe_nat_gateways")
+            return {
+                address["AllocationId"]
+                for page in paginator.paginate()
+                for nat_gateway in page["NatGateways"]
+                for address in nat_gateway.get("NatGatewayAddresses", [])
+                if address.get("AllocationId")
+            }
         except Exception as e:
-            logger.error(f"Error checking NAT Gateway association for Allocation ID {allocation_id}: {e}")
-            return False
+            logger.error(f"Error retrieving NAT Gateway associations: {e}")
+            return set()
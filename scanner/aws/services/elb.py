@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta, timezone
+import numpy as np
 from utils.logger import get_logger
 from config.config import DAYS_THRESHOLD
 from scanner.resource_scanner_registry import ResourceScannerRegistry
-from scanner.aws.utils.scanner_helper import fetch_metric, determine_metric_time_window, extract_tag_value
+from scanner.aws.utils.scanner_helper import build_metric_query, fetch_metrics_batch, METRIC_PERIOD
 
 logger = get_logger(__name__)
 
+MAX_DESCRIBE_TAGS_ARNS = 20  # Maximum number of resource ARNs accepted by a single DescribeTags request
+
 class ElbScanner(ResourceScannerRegistry):
     """
     Scanner for Elastic Load Balancers (ELBs).
@@ -24,15 +27,21 @@ class ElbScanner(ResourceScannerRegistry):
             cloudwatch_client = session.get_client("cloudwatch")
             load_balancers = elbv2_client.describe_load_balancers()["LoadBalancers"]
             unused_lb = []
+            # Retrieve the CloudWatch metrics of every Load Balancer up front in batched requests
+            metrics_by_lb = self._get_load_balancers_metrics(cloudwatch_client, load_balancers)
+            tag_names = self._get_unnamed_load_balancer_tag_names(elbv2_client, load_balancers)
 
-            for lb in load_balancers:
+            for lb, metric_data in zip(load_balancers, metrics_by_lb):
                 lb_arn = lb["LoadBalancerArn"]
-                lb_name = self._get_load_balancer_name(elbv2_client, lb)
+                lb_name = lb.get("LoadBalancerName", "Unnamed")
+                if lb_name == "Unnamed":
+                    lb_name = tag_names.get(lb_arn, lb_name)
+
+                if metric_data is None:
+                    logger.warning("Skipping Load Balancer %s (%s) as its metrics could not be retrieved.", lb_name, lb_arn)
+                    continue
 
-                logger.debug(f"Scanning Load Balancer {lb_name} ({lb_arn})...")
-                
-                # Retrieve CloudWatch metrics using the helper function
-                metric_data = self._get_load_balancer_metrics(cloudwatch_client, lb_arn)
+                logger.debug("Scanning Load Balancer %s (%s)...", lb_name, lb_arn)
 
                 # Check if Load Balancer is unused
                 if self._is_unused_load_balancer(metric_data):
@@ -44,58 +53,90 @@ class ElbScanner(ResourceScannerRegistry):
                         "Name": lb_name,
                         "Reason": reason
                     })
-                    logger.debug(f"Load Balancer {lb_name} is unused. Reason: {reason}")
+                    logger.debug("Load Balancer %s is unused. Reason: %s", lb_name, reason)
 
-            logger.info(f"Found {len(unused_lb)} unused Load Balancers.")
+            logger.info("Found %s unused Load Balancers.", len(unused_lb))
             return unused_lb
 
         except Exception as e:
             logger.error(f"Error retrieving Load Balancers: {e}")
             return []
 
-    def _get_load_balancer_name(self, elbv2_client, lb):
-        """Retrieve the Load Balancer name from attributes or tags."""
-        lb_name = lb.get("LoadBalancerName", "Unnamed")
-        if lb_name == "Unnamed":
+    def _get_unnamed_load_balancer_tag_names(self, elbv2_client, load_balancers):
+        """Retrieve the Name tag of the Load Balancers without a name, with as few DescribeTags requests as possible."""
+        unnamed_arns = [lb["LoadBalancerArn"] for lb in load_balancers if lb.get("LoadBalancerName", "Unnamed") == "Unnamed"]
+        tag_names = {}
+        for offset in range(0, len(unnamed_arns), MAX_DESCRIBE_TAGS_ARNS):
+            arns = unnamed_arns[offset:offset + MAX_DESCRIBE_TAGS_ARNS]
             try:
-                tags = elbv2_client.describe_tags(ResourceArns=[lb["LoadBalancerArn"]])["TagDescriptions"]
-                for tag_description in tags:
-                    for tag in tag_description.get("Tags", []):  # Safe access to the "Tags" list
-                        if "Key" in tag and tag["Key"] == "Name":  # Ensure "Key" exists in the tag
-                            return tag.get("Value", "Unnamed")  # Return tag value if present, else default to "Unnamed"
+                tag_descriptions = elbv2_client.describe_tags(ResourceArns=arns)["TagDescriptions"]
             except Exception as e:
-                logger.warning(f"Could not retrieve tags for Load Balancer {lb['LoadBalancerArn']}: {e}")
-        return lb_name
-
-
-    def _get_load_balancer_metrics(self, cloudwatch_client, lb_arn):
-        """Retrieve CloudWatch metrics for the Load Balancer."""
-        try:
-            end_time = datetime.now(timezone.utc)
-            start_time = end_time - timedelta(days=DAYS_THRESHOLD)
-
-            total_requests = fetch_metric(cloudwatch_client, 'AWS/ApplicationELB', lb_arn, 'LoadBalancer', 'RequestCount', 'Sum', start_time, end_time)
-            total_bytes_sent = fetch_metric(cloudwatch_client, 'AWS/ApplicationELB', lb_arn, 'LoadBalancer', 'ProcessedBytes', 'Sum', start_time, end_time)
-
-            return {
-                "TotalRequests": total_requests,
-                "TotalBytesSent": total_bytes_sent,
-                "RequestDeviation": self._calculate_request_deviation([total_requests])
-            }
-
-        except Exception as e:
-            logger.error(f"Error retrieving metrics for Load Balancer {lb_arn}: {e}")
-            return {"TotalRequests": 0, "TotalBytesSent": 0, "RequestDeviation": 0}
-
-    def _calculate_request_deviation(self, request_count_data):
-        """Calculate traffic variation based on the standard deviation."""
-        if len(request_count_data) < 2:
-            return 0
-        mean = sum(request_count_data) / len(request_count_data)
-        variance = sum((x - mean) ** 2 for x in request_count_data) / len(request_count_data)
-        deviation = variance ** 0.5
-        logger.debug(f"Calculated traffic deviation: {deviation}")
-        return deviation
+                logger.warning(f"Could not retrieve tags for Load Balancers {', '.join(arns)}: {e}")
+                continue
+            for tag_description in tag_descriptions:
+                for tag in tag_description.get("Tags", []):  # Safe access to the "Tags" list
+                    if tag.get("Key") == "Name":
+                        tag_names[tag_description["ResourceArn"]] = tag.get("Value", "Unnamed")
+                        break
+        return tag_names
+
+    def _get_load_balancers_metrics(self, cloudwatch_client, load_balancers):
+        """
+        Retrieve CloudWatch traffic metrics for all the Load Balancers, in the same order, with batched requests.
+        The metrics of a Load Balancer are None if they could not be retrieved.
+        """
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(days=DAYS_THRESHOLD)
+
+        window_period = max(DAYS_THRESHOLD * 86400, METRIC_PERIOD)
+        metric_queries = []
+        for index, lb in enumerate(load_balancers):
+            dimensions = [{"Name": "LoadBalancer", "Value": lb["LoadBalancerArn"]}]
+            # Hourly request counts are kept, their deviation measures the traffic variation
+            metric_queries.append(build_metric_query(f"requests_{index}", 'AWS/ApplicationELB', 'RequestCount', dimensions, 'Sum'))
+            # A single period spanning the whole window makes CloudWatch return the total directly
+            metric_queries.append(build_metric_query(
+                f"bytes_{index}", 'AWS/ApplicationELB', 'ProcessedBytes', dimensions, 'Sum', period=window_period
+            ))
+        values_by_id = fetch_metrics_batch(cloudwatch_client, metric_queries, start_time, end_time)
+
+        # A failed request leaves its queries out, which must not be mistaken for a Load Balancer without traffic
+        available = [
+            f"requests_{index}" in values_by_id and f"bytes_{index}" in values_by_id
+            for index in range(len(load_balancers))
+        ]
+        total_requests, request_deviations = self._calculate_request_statistics(
+            [values_by_id.get(f"requests_{index}", np.zeros(0)) for index in range(len(load_balancers))]
+        )
+        return [
+            {
+                "TotalRequests": float(total_requests[index]),
+                "TotalBytesSent": values_by_id[f"bytes_{index}"].sum(),
+                "RequestDeviation": float(request_deviations[index])
+            } if available[index] else None
+            for index in range(len(load_balancers))
+        ]
+
+    def _calculate_request_statistics(self, request_series):
+        """
+        Calculate the total requests and the traffic variation, based on the population standard deviation,
+        of every Load Balancer at once from the concatenation of their hourly request counts.
+        """
+        count = len(request_series)
+        if not count:
+            return np.zeros(0), np.zeros(0)
+        sizes = np.fromiter((len(values) for values in request_series), dtype=np.int64, count=count)
+        owners = np.repeat(np.arange(count), sizes)
+        values = np.concatenate(request_series)
+
+        totals = np.bincount(owners, weights=values, minlength=count).astype(np.float64)
+        means = np.divide(totals, sizes, out=np.zeros(count), where=sizes > 0)
+        squared_deviations = np.bincount(owners, weights=(values - means[owners]) ** 2, minlength=count)
+        deviations = np.sqrt(np.divide(squared_deviations, sizes, out=np.zeros(count), where=sizes >= 2))
+        # Load Balancers without requests are unused whatever their deviation
+        deviations[totals == 0] = 0
+        logger.debug("Calculated traffic deviations: %s", deviations)
+        return totals, deviations
 
     def _is_unused_load_balancer(self, metric_data):
         """Determine if the Load Balancer is unused based on metrics."""
@@ -1,11 +1,16 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
 from scanner.aws.utils.scanner_helper import calculate_and_format_age_in_time_units
 
 logger = get_logger(__name__)
 
+# Service roles and AWS reserved roles (e.g., SSO permission sets) are managed by AWS and never reported
+RESERVED_ROLE_PATTERN = re.compile(r"service-role|aws-reserved")
+
 class IAMRoleScanner(ResourceScannerRegistry):
     """
     Scanner for identifying unused IAM roles.
@@ -26,56 +31,82 @@ class IAMRoleScanner(ResourceScannerRegistry):
         logger.debug("Starting scan for unused IAM Roles...")
         try:
             iam_client = session.get_client("iam")
-            roles = iam_client.list_roles().get("Roles", [])
-            unused_roles = []
             current_time = datetime.now(timezone.utc)
 
-            for role in roles:
-                role_name = role["RoleName"]
-                role_arn = role["Arn"]
-                logger.debug(f"Checking role: {role_name} (ARN: {role_arn})")
-
-                # Skip service or reserved roles
-                if self._is_reserved_role(role_arn):
-                    logger.debug(f"Skipping reserved role: {role_name}")
-                    continue
-
-                # Analyze role details
-                last_used, last_used_time = self._get_role_last_used(iam_client, role_name, current_time)
-
-                # Calculate formatted age string
-                age_string = (
-                    calculate_and_format_age_in_time_units(current_time, last_used_time)
-                    if last_used_time
-                    else "Never used"
-                )
-
-                attached_policies, inline_policies, instance_profiles = self._get_role_policies(iam_client, role_name)
-
-                # Determine reasons for unused status
-                reasons = self._determine_unused_reasons(last_used_time, attached_policies, inline_policies, instance_profiles, age_string)
-
-                if reasons:
-                    unused_roles.append({
-                        "ResourceName": role_name,
-                        "ResourceId": role_arn,
-                        "LastUsed": age_string,
-                        "InstanceProfiles": len(instance_profiles),
-                        "PoliciesAttached": len(attached_policies) + len(inline_policies),
-                        "Reason": "\n".join(reasons),
-                    })
-                    logger.debug(f"Unused role identified: {role_name} - Reasons: {reasons}")
-
-            logger.info(f"Found {len(unused_roles)} unused IAM Roles.")
+            # Each role needs several IAM round-trips, so the roles of a page are checked concurrently;
+            # pages are submitted one at a time so only a single page of roles is in flight
+            unused_roles = []
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                for roles in self._iter_candidate_role_pages(iam_client, current_time):
+                    unused_roles.extend(
+                        unused_role for unused_role in executor.map(
+                            lambda role: self._check_role(iam_client, role, current_time), roles
+                        )
+                        if unused_role
+                    )
+
+            logger.info("Found %s unused IAM Roles.", len(unused_roles))
             return unused_roles
 
         except Exception as e:
             logger.error(f"Error during IAM role scan: {e}")
             return []
 
+    def _iter_candidate_role_pages(self, iam_client, current_time):
+        """
+        Yield the roles to check as one list per page, skipping service or reserved roles and roles too recent
+        to have been unused for DAYS_THRESHOLD days.
+        """
+        # ListRoles returns at most 100 roles per call, so every page is retrieved
+        for page in iam_client.get_paginator("list_roles").paginate():
+            yield [role for role in page["Roles"] if self._is_candidate_role(role, current_time)]
+
+    def _is_candidate_role(self, role, current_time):
+        """Check whether a role should be checked for usage."""
+        if self._is_reserved_role(role["Arn"]):
+            logger.debug("Skipping reserved role: %s", role["RoleName"])
+            return False
+        if (current_time - role["CreateDate"]).days < DAYS_THRESHOLD:
+            logger.debug("Skipping role %s created less than %s days ago.", role["RoleName"], DAYS_THRESHOLD)
+            return False
+        return True
+
+    def _check_role(self, iam_client, role, current_time):
+        """Analyze a single role and return its details if it is unused, else None."""
+        role_name = role["RoleName"]
+        role_arn = role["Arn"]
+        logger.debug("Checking role: %s (ARN: %s)", role_name, role_arn)
+
+        # Analyze role details
+        last_used, last_used_time = self._get_role_last_used(iam_client, role_name, current_time)
+
+        # Calculate formatted age string
+        age_string = (
+            calculate_and_format_age_in_time_units(current_time, last_used_time)
+            if last_used_time
+            else "Never used"
+        )
+
+        attached_policies, inline_policies, instance_profiles = self._get_role_policies(iam_client, role_name)
+
+        # Determine reasons for unused status
+        reasons = self._determine_unused_reasons(last_used_time, attached_policies, inline_policies, instance_profiles, age_string, current_time)
+        if not reasons:
+            return None
+
+        logger.debug("Unused role identified: %s - Reasons: %s", role_name, reasons)
+        return {
+            "ResourceName": role_name,
+            "ResourceId": role_arn,
+            "LastUsed": age_string,
+            "InstanceProfiles": len(instance_profiles),
+            "PoliciesAttached": len(attached_policies) + len(inline_policies),
+            "Reason": "\n".join(reasons),
+        }
+
     def _is_reserved_role(self, role_arn):
         """Check if the role is reserved (service or AWS reserved)."""
-        return "service-role" in role_arn or "aws-reserved" in role_arn
+        return RESERVED_ROLE_PATTERN.search(role_arn) is not None
 
     def _get_role_last_used(self, iam_client, role_name, current_time):
         """Retrieve the last used time and calculate time since last used."""
@@ -85,17 +116,22 @@ class IAMRoleScanner(ResourceScannerRegistry):
 
     def _get_role_policies(self, iam_client, role_name):
         """Retrieve the attached policies, inline policies, and instance profiles for the role."""
-        attached_policies = iam_client.list_attached_role_policies(RoleName=role_name).get("AttachedPolicies", [])
-        inline_policies = iam_client.list_role_policies(RoleName=role_name).get("PolicyNames", [])
-        instance_profiles = iam_client.list_instance_profiles_for_role(RoleName=role_name).get("InstanceProfiles", [])
+        attached_policies = self._list_all(iam_client, "list_attached_role_policies", "AttachedPolicies", role_name)
+        inline_policies = self._list_all(iam_client, "list_role_policies", "PolicyNames", role_name)
+        instance_profiles = self._list_all(iam_client, "list_instance_profiles_for_role", "InstanceProfiles", role_name)
         return attached_policies, inline_policies, instance_profiles
 
-    def _determine_unused_reasons(self, last_used_time, attached_policies, inline_policies, instance_profiles, age_string):
+    def _list_all(self, iam_client, operation_name, result_key, role_name):
+        """Retrieve every page of a role's IAM listing, which would otherwise be truncated at its first page."""
+        paginator = iam_client.get_paginator(operation_name)
+        return [item for page in paginator.paginate(RoleName=role_name) for item in page.get(result_key, [])]
+
+    def _determine_unused_reasons(self, last_used_time, attached_policies, inline_policies, instance_profiles, age_string, current_time):
         """Determine the reasons the role is considered unused."""
         reasons = []
         if not last_used_time:
             reasons.append("Role has never been used.")
-        elif (datetime.now(timezone.utc) - last_used_time).days > DAYS_THRESHOLD:
+        elif (current_time - last_used_time).days > DAYS_THRESHOLD:
             reasons.append(f"Role has not been used for {age_string}.")
         if not attached_policies and not inline_policies and not instance_profiles:
             reasons.append("No attached policies or instance profiles.")
@@ -1,11 +1,21 @@
+import csv
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from botocore.exceptions import BotoCoreError, ClientError
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
 from scanner.aws.utils.scanner_helper import calculate_and_format_age_in_time_units
 
 logger = get_logger(__name__)
 
+CREDENTIAL_REPORT_POLL_INTERVAL = 2  # Seconds between checks while the credential report is being generated
+CREDENTIAL_REPORT_MAX_ATTEMPTS = 30
+# Credential report columns holding the last used date of each of the (at most two) access keys of a user
+ACCESS_KEY_LAST_USED_COLUMNS = ("access_key_1_last_used_date", "access_key_2_last_used_date")
+
 class IAMUserScanner(ResourceScannerRegistry):
     """
     Scanner for identifying unused IAM users.
@@ -26,55 +36,134 @@ class IAMUserScanner(ResourceScannerRegistry):
         logger.debug("Starting scan for unused IAM Users...")
         try:
             iam_client = session.get_client("iam")
-            users = iam_client.list_users().get("Users", [])
-            unused_users = []
+            # ListUsers returns at most 100 users per call by default, so larger pages are requested
+            paginator = iam_client.get_paginator("list_users")
             current_time = datetime.now(timezone.utc)
+            # The credential report gives every user's key usage at once, instead of several calls per user
+            key_usage_by_user = self._get_key_usage_from_credential_report(iam_client)
+
+            # Users missing from the credential report need IAM round-trips, so the users of a page are checked
+            # concurrently; pages are submitted one at a time so only a single page of users is in flight
+            unused_users = []
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                for page in paginator.paginate(PaginationConfig={"PageSize": 1000}):
+                    unused_users.extend(
+                        unused_user for unused_user in executor.map(
+                            lambda user: self._check_user(iam_client, user, key_usage_by_user, current_time), page["Users"]
+                        )
+                        if unused_user
+                    )
 
-            for user in users:
-                user_name = user["UserName"]
-                user_arn = user["Arn"]
-                logger.debug(f"Checking user: {user_name} (ARN: {user_arn})")
-
-                # Check last UI activity and key activity
-                last_login_time = user.get("PasswordLastUsed")
-                key_last_used_time = self._get_latest_key_usage_time(iam_client, user_name)
-
-                # Calculate formatted age strings
-                last_login_age = (
-                    calculate_and_format_age_in_time_units(current_time, last_login_time)
-                    if last_login_time
-                    else "Never used"
-                )
-                key_last_used_age = (
-                    calculate_and_format_age_in_time_units(current_time, key_last_used_time)
-                    if key_last_used_time
-                    else "Never used"
-                )
-
-                # Determine reasons for unused status
-                reasons = self._determine_unused_reasons(last_login_time, key_last_used_time, last_login_age, key_last_used_age)
-
-                if reasons:
-                    unused_users.append({
-                        "ResourceName": user_name,
-                        "ResourceId": user_arn,
-                        "LastLogin": last_login_age,
-                        "LastKeyUsage": key_last_used_age,
-                        "Reason": "\n".join(reasons),
-                    })
-                    logger.debug(f"Unused user identified: {user_name} - Reasons: {reasons}")
-
-            logger.info(f"Found {len(unused_users)} unused IAM Users.")
+            logger.info("Found %s unused IAM Users.", len(unused_users))
             return unused_users
 
         except Exception as e:
             logger.error(f"Error during IAM user scan: {e}")
             return []
 
+    def _check_user(self, iam_client, user, key_usage_by_user, current_time):
+        """Analyze a single user and return its details if it is unused, else None."""
+        user_name = user["UserName"]
+        user_arn = user["Arn"]
+        logger.debug("Checking user: %s (ARN: %s)", user_name, user_arn)
+
+        # Check last UI activity and key activity
+        last_login_time = user.get("PasswordLastUsed")
+        keys_checked = True
+        # Users created after the credential report was generated are not part of it
+        if key_usage_by_user is not None and user_name in key_usage_by_user:
+            key_last_used_time = key_usage_by_user[user_name]
+        elif last_login_time and (current_time - last_login_time).days < DAYS_THRESHOLD:
+            # Probing the keys of a user missing from the report costs API calls per key, which is not worth it
+            # for a user who logged in recently
+            logger.info("User %s logged in recently and is not in the credential report, its access keys are not checked.", user_name)
+            key_last_used_time = None
+            keys_checked = False
+        else:
+            key_last_used_time = self._get_latest_key_usage_time(iam_client, user_name)
+
+        # Calculate formatted age strings
+        last_login_age = (
+            calculate_and_format_age_in_time_units(current_time, last_login_time)
+            if last_login_time
+            else "Never used"
+        )
+        if not keys_checked:
+            key_last_used_age = "Not checked"
+        elif key_last_used_time:
+            key_last_used_age = calculate_and_format_age_in_time_units(current_time, key_last_used_time)
+        else:
+            key_last_used_age = "Never used"
+
+        # Determine reasons for unused status
+        reasons = self._determine_unused_reasons(last_login_time, key_last_used_time, last_login_age, key_last_used_age, current_time)
+        if not reasons:
+            return None
+
+        logger.debug("Unused user identified: %s - Reasons: %s", user_name, reasons)
+        return {
+            "ResourceName": user_name,
+            "ResourceId": user_arn,
+            "LastLogin": last_login_age,
+            "LastKeyUsage": key_last_used_age,
+            "Reason": "\n".join(reasons),
+        }
+
+    def _get_key_usage_from_credential_report(self, iam_client):
+        """
+        Retrieve the latest access key usage time of every user from the IAM credential report.
+
+        :param iam_client: IAM client for AWS API calls.
+        :return: A dictionary mapping user names to their latest key usage time (None if never used),
+                 or None if the credential report is unavailable.
+        """
+        try:
+            for _ in range(CREDENTIAL_REPORT_MAX_ATTEMPTS):
+                if iam_client.generate_credential_report()["State"] == "COMPLETE":
+                    break
+                time.sleep(CREDENTIAL_REPORT_POLL_INTERVAL)
+            else:
+                logger.warning("IAM credential report was not ready in time, checking access keys user by user.")
+                return None
+
+            content = iam_client.get_credential_report()["Content"].decode("utf-8")
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Could not retrieve the IAM credential report, checking access keys user by user: {e}")
+            return None
+
+        # Only three columns are needed, so rows are read as plain lists instead of building a dict per user
+        rows = csv.reader(io.StringIO(content))
+        header = next(rows, [])
+        try:
+            user_index = header.index("user")
+            key_column_indexes = [header.index(column) for column in ACCESS_KEY_LAST_USED_COLUMNS]
+        except ValueError:
+            logger.warning("Unexpected IAM credential report format, checking access keys user by user.")
+            return None
+
+        key_usage_by_user = {}
+        row_length = max(user_index, *key_column_indexes) + 1
+        for row in rows:
+            # Users on truncated rows are left out, so their access keys are checked user by user
+            if len(row) < row_length:
+                logger.warning("Skipping a malformed row of the IAM credential report.")
+                continue
+            key_usage_times = [self._parse_credential_report_time(row[index]) for index in key_column_indexes]
+            key_usage_by_user[row[user_index]] = max(filter(None, key_usage_times), default=None)
+        return key_usage_by_user
+
+    def _parse_credential_report_time(self, value):
+        """Parse a credential report timestamp, returning None for placeholders such as 'N/A' or 'no_information'."""
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
     def _get_latest_key_usage_time(self, iam_client, user_name):
         """Retrieve the latest key usage time for a user."""
         try:
-            access_keys = iam_client.list_access_keys(UserName=user_name).get("AccessKeyMetadata", [])
+            paginator = iam_client.get_paginator("list_access_keys")
+            access_keys = [key for page in paginator.paginate(UserName=user_name) for key in page["AccessKeyMetadata"]]
             latest_usage_time = None
             for key in access_keys:
                 key_id = key["AccessKeyId"]
@@ -82,18 +171,18 @@ class IAMUserScanner(ResourceScannerRegistry):
                 if key_last_used and (latest_usage_time is None or key_last_used > latest_usage_time):
                     latest_usage_time = key_last_used
             return latest_usage_time
-        except Exception as e:
+        except (ClientError, BotoCoreError) as e:
             logger.error(f"Error checking key usage: {e}")
             return None
 
-    def _determine_unused_reasons(self, last_login_time, key_last_used_time, last_login_age, key_last_used_age):
+    def _determine_unused_reasons(self, last_login_time, key_last_used_time, last_login_age, key_last_used_age, current_time):
         """Determine the reasons the user is considered unused."""
         reasons = []
         if not last_login_time and not key_last_used_time:
             reasons.append("User has never logged in or used access keys.")
         else:
-            if last_login_time and (datetime.now(timezone.utc) - last_login_time).days >= DAYS_THRESHOLD:
+            if last_login_time and (current_time - last_login_time).days >= DAYS_THRESHOLD:
                 reasons.append(f"UI login last used {last_login_age}.")
-            if key_last_used_time and (datetime.now(timezone.utc) - key_last_used_time).days >= DAYS_THRESHOLD:
+            if key_last_used_time and (current_time - key_last_used_time).days >= DAYS_THRESHOLD:
                 reasons.append(f"Access keys last used {key_last_used_age}.")
         return reasons
@@ -1,16 +1,21 @@
-from datetime import datetime, timezone
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import BotoCoreError, ClientError
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
 from scanner.aws.utils.scanner_helper import (
-    determine_metric_time_window,
-    fetch_metric,
+    fetch_metrics,
     determine_unused_reason,
+    METRIC_PERIOD,
 )
 from scanner.aws.cost_estimator import CostEstimator
 
 logger = get_logger(__name__)
 
+COST_TYPES = ("hourly", "daily", "monthly", "yearly", "lifetime")
+
 
 class OpenSearchScanner(ResourceScannerRegistry):
     """
@@ -32,82 +37,101 @@ class OpenSearchScanner(ResourceScannerRegistry):
             es_client = session.get_client("opensearch")
             cloudwatch_client = session.get_client("cloudwatch")
             domains = es_client.list_domain_names()["DomainNames"]
-            unused_clusters = []
             current_time = datetime.now(timezone.utc)
-            logger.debug(f"Found {len(domains)} Opensearch Clusters")
-            for domain in domains:
-                domain_name = domain["DomainName"]
-                logger.debug(f"Checking OpenSearch cluster {domain_name} for usage...")
-
-                # Fetch domain details
-                domain_details = es_client.describe_domain(DomainName=domain_name)["DomainStatus"]
-                creation_time = domain_details.get("Created", "Unknown")
-                instance_type = domain_details.get("ClusterConfig", {}).get("InstanceType", "Unknown")
-                instance_count = domain_details.get("ClusterConfig", {}).get("InstanceCount", 1)
-                storage_type = domain_details.get("EBSOptions", {}).get("VolumeType", "Unknown")
-                storage_size = domain_details.get("EBSOptions", {}).get("VolumeSize", 0)
-
-                # Determine the metric time window
-                start_time = determine_metric_time_window(creation_time, current_time, DAYS_THRESHOLD)
-
-                # Fetch CloudWatch metrics for usage
-                metrics = {
-                    "cpu_utilization": fetch_metric(
-                        cloudwatch_client, "AWS/ES", domain_name, "DomainName", "CPUUtilization", "Average", start_time, current_time
-                    ),
-                    "search_rate": fetch_metric(
-                        cloudwatch_client, "AWS/ES", domain_name, "DomainName", "SearchRate", "Sum", start_time, current_time
-                    ),
-                    "index_rate": fetch_metric(
-                        cloudwatch_client, "AWS/ES", domain_name, "DomainName", "IndexRate", "Sum", start_time, current_time
-                    ),
-                }
-
-                # Calculate usage totals
-                cpu_total = sum(metrics["cpu_utilization"])
-                search_rate_total = sum(metrics["search_rate"])
-                index_rate_total = sum(metrics["index_rate"])
-
-                # Check for unused clusters
-                unused_conditions = [
-                    (lambda m: (search_rate_total == 0, "No search activity.")),
-                    (lambda m: (index_rate_total == 0, "No indexing activity.")),
-                    (lambda m: (cpu_total < 5, f"Low CPU utilization ({cpu_total}%)")),
+            logger.debug("Found %s Opensearch Clusters", len(domains))
+            # Each domain needs several round-trips, so the domains are checked concurrently
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                unused_clusters = [
+                    unused_cluster for unused_cluster in executor.map(
+                        lambda domain: self._check_domain(es_client, cloudwatch_client, domain["DomainName"], current_time),
+                        domains
+                    )
+                    if unused_cluster
                 ]
-                reason = determine_unused_reason(metrics, unused_conditions)
-
-                # Calculate costs
-                hours_running = (current_time - creation_time).total_seconds() / 3600
-                instance_cost = self.cost_estimator.calculate_cost(
-                    "EC2 Instances", resource_size=instance_type, hours_running=hours_running
-                )
-                ebs_cost = self.cost_estimator.calculate_cost(
-                    "EBS Volumes", resource_size=storage_size, hours_running=hours_running
-                )
-
-                if reason:
-                    unused_clusters.append({
-                        "DomainName": domain_name,
-                        "CreationTime": creation_time,
-                        "InstanceType": instance_type,
-                        "InstanceCount": instance_count,
-                        "StorageType": storage_type,
-                        "StorageSizeGB": storage_size,
-                        "CPUUtilization": cpu_total,
-                        "SearchRate": search_rate_total,
-                        "IndexRate": index_rate_total,
-                        "Reason": reason,
-                        "Costs": {self.label: self._combined_costs([instance_cost,ebs_cost])
-                        },
-                    })
-                    logger.debug(f"OpenSearch cluster {domain_name} is unused or underutilized: {reason}")
-
-            logger.info(f"Found {len(unused_clusters)} unused OpenSearch clusters.")
+
+            logger.info("Found %s unused OpenSearch clusters.", len(unused_clusters))
             return unused_clusters
         except Exception as e:
             logger.error(f"Error during OpenSearch scan: {e}")
             return []
 
+    def _check_domain(self, es_client, cloudwatch_client, domain_name, current_time):
+        """Analyze a single OpenSearch domain and return its details if it is unused, else None."""
+        logger.debug("Checking OpenSearch cluster %s for usage...", domain_name)
+
+        # Fetch domain details; a domain that cannot be described is skipped without failing the others
+        try:
+            domain_details = es_client.describe_domain(DomainName=domain_name)["DomainStatus"]
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Error describing OpenSearch cluster {domain_name}: {e}")
+            return None
+        cluster_config = domain_details.get("ClusterConfig") or {}
+        ebs_options = domain_details.get("EBSOptions") or {}
+        instance_type = cluster_config.get("InstanceType", "Unknown")
+        instance_count = cluster_config.get("InstanceCount", 1)
+        storage_type = ebs_options.get("VolumeType", "Unknown")
+        storage_size = ebs_options.get("VolumeSize", 0)
+
+        # DomainStatus only tells whether the domain has been created, not when (its CreationTime is reported as
+        # "Unknown"), so usage is always checked over the full DAYS_THRESHOLD window
+        start_time = current_time - timedelta(days=DAYS_THRESHOLD)
+
+        # Fetch all three usage metrics with a single GetMetricData request. The CPU threshold applies to the
+        # sum of hourly averages, while a Sum over the whole window equals the sum of its hourly Sums, so the
+        # reported rate totals are unchanged with a whole-window period
+        window_period = max(DAYS_THRESHOLD * 86400, METRIC_PERIOD)
+        cpu_utilization, search_rate, index_rate = fetch_metrics(
+            cloudwatch_client, "AWS/ES", domain_name, "DomainName",
+            [("CPUUtilization", "Average"), ("SearchRate", "Sum", window_period), ("IndexRate", "Sum", window_period)],
+            start_time, current_time,
+        )
+
+        # Calculate usage totals
+        cpu_total = cpu_utilization.sum()
+        search_rate_total = search_rate.sum()
+        index_rate_total = index_rate.sum()
+
+        # Check for unused clusters; the totals are already computed, so the conditions are plain booleans
+        unused_conditions = [
+            ("No search activity.", search_rate_total == 0),
+            ("No indexing activity.", index_rate_total == 0),
+            (lambda: f"Low CPU utilization ({cpu_total}%)", cpu_total < 5),
+        ]
+        reason = determine_unused_reason(unused_conditions)
+        if not reason:
+            return None
+
+        # Calculate costs, only needed for the clusters that are reported; without a creation time, the
+        # lifetime is unknown, so the cost is computed over the checked window and reported as such
+        hours_running = DAYS_THRESHOLD * 24
+        instance_cost = self.cost_estimator.calculate_cost(
+            "EC2 Instances", resource_size=instance_type, hours_running=hours_running
+        )
+        ebs_cost = self.cost_estimator.calculate_cost(
+            "EBS Volumes", resource_size=storage_size, hours_running=hours_running
+        )
+
+        costs = self._combined_cost([instance_cost, ebs_cost])
+        window_cost = costs["lifetime"]
+        costs["lifetime"] = "N/A"
+
+        logger.debug("OpenSearch cluster %s is unused or underutilized: %s", domain_name, reason)
+        return {
+            "DomainName": domain_name,
+            "CreationTime": "Unknown",
+            "InstanceType": instance_type,
+            "InstanceCount": instance_count,
+            "StorageType": storage_type,
+            "StorageSizeGB": storage_size,
+            "CPUUtilization": cpu_total,
+            "SearchRate": search_rate_total,
+            "IndexRate": index_rate_total,
+            "Reason": reason,
+            "WindowCost": window_cost,
+            "Costs": {self.label: costs
+            },
+        }
+
     def _combined_cost(self,costs_list):
         """
         Aggregates EC2 instance and EBS volume costs for hourly, daily, monthly, yearly, and lifetime.
@@ -115,17 +139,9 @@ class OpenSearchScanner(ResourceScannerRegistry):
         :param costs_list: A list of cost dictionaries, each containing cost categories ('hourly', 'daily', etc.).
         :return: A dictionary with aggregated costs for each category.
         """
-        aggregated_costs = {
-            "hourly": 0.0,
-            "daily": 0.0,
-            "monthly": 0.0,
-            "yearly": 0.0,
-            "lifetime": 0.0,
-        }
-
-        for cost in costs_list:
-            for key in aggregated_costs:
-                if key in cost and isinstance(cost[key], (int, float)):
-                    aggregated_costs[key] += cost[key]
-
-        return aggregated_costs
\ No newline at end of file
+        # Costs whose price is unavailable are None, and non-numeric values (e.g., "N/A") are skipped
+        costs = [cost for cost in costs_list if cost]
+        return {
+            key: math.fsum(cost[key] for cost in costs if isinstance(cost.get(key), (int, float)))
+            for key in COST_TYPES
+        }
\ No newline at end of file
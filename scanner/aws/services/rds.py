@@ -1,11 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from utils.logger import get_logger
-from config.config import DAYS_THRESHOLD
+from config.config import DAYS_THRESHOLD, MAX_CONCURRENT_REQUESTS
 from scanner.resource_scanner_registry import ResourceScannerRegistry
 from scanner.aws.utils.scanner_helper import (
     determine_metric_time_window,
-    fetch_metric,
-    determine_unused_reason
+    fetch_metrics,
+    determine_unused_reason,
+    METRIC_PERIOD
 )
 
 logger = get_logger(__name__)
@@ -32,56 +34,75 @@ class RDSScanner(ResourceScannerRegistry):
             rds_client = session.get_client("rds")
             cloudwatch_client = session.get_client("cloudwatch")
             instances = rds_client.describe_db_instances().get("DBInstances", [])
-            unused_instances = []
             current_time = datetime.now(timezone.utc)
 
-            for instance in instances:
-                instance_id = instance["DBInstanceIdentifier"]
-                cluster_id = instance.get("DBClusterIdentifier", None)
-                logger.debug(f"Checking RDS instance {instance_id} for usage...")
-
-                creation_time = instance["InstanceCreateTime"]
-                start_time = determine_metric_time_window(creation_time, current_time, DAYS_THRESHOLD)
-
-                # Fetch CloudWatch metrics (note: the new fetch_metric returns a list of values)
-                metrics = {
-                    "cpu_usage": fetch_metric(cloudwatch_client, "AWS/RDS", instance_id, "DBInstanceIdentifier", "CPUUtilization", "Average", start_time, current_time),
-                    "connections": fetch_metric(cloudwatch_client, "AWS/RDS", instance_id, "DBInstanceIdentifier", "DatabaseConnections", "Maximum", start_time, current_time),
-                    "read_iops": fetch_metric(cloudwatch_client, "AWS/RDS", instance_id, "DBInstanceIdentifier", "ReadIOPS", "Sum", start_time, current_time),
-                    "write_iops": fetch_metric(cloudwatch_client, "AWS/RDS", instance_id, "DBInstanceIdentifier", "WriteIOPS", "Sum", start_time, current_time)
-                }
-
-                # Sum the metric values to get totals for CPU, connections, and I/O
-                cpu_usage_total = sum(metrics["cpu_usage"])  # Sum the CPU usage
-                connections_total = sum(metrics["connections"])  # Sum the connections
-                read_iops_total = sum(metrics["read_iops"])  # Sum the read IOPS
-                write_iops_total = sum(metrics["write_iops"])  # Sum the write IOPS
-
-                # Define unused conditions based on the summed metrics
-                unused_conditions = [
-                    (lambda m: (connections_total == 0, "No active connections.")),
-                    (lambda m: (cpu_usage_total < 1, f"Low CPU utilization ({cpu_usage_total}%)")),
-                    (lambda m: (read_iops_total + write_iops_total == 0, "No read/write I/O activity."))
+            # Each instance needs its own CloudWatch round-trip, so the instances are checked concurrently
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                unused_instances = [
+                    unused_instance for unused_instance in executor.map(
+                        lambda instance: self._check_instance(cloudwatch_client, instance, current_time), instances
+                    )
+                    if unused_instance
                 ]
 
-                reason = determine_unused_reason(metrics, unused_conditions)
-                if reason:
-                    unused_instances.append({
-                        "ResourceName": instance_id,
-                        "ResourceId": cluster_id,
-                        "DBInstanceClass": instance["DBInstanceClass"],
-                        "Engine": instance["Engine"],
-                        "InstanceCreateTime": creation_time,
-                        "Connections": connections_total,
-                        "CPUUsage": cpu_usage_total,
-                        "ReadIOPS": read_iops_total,
-                        "WriteIOPS": write_iops_total,
-                        "Reason": reason
-                    })
-                    logger.debug(f"RDS instance {instance_id} is unused or underutilized: {reason}")
-
-            logger.info(f"Found {len(unused_instances)} unused RDS instances.")
+            logger.info("Found %s unused RDS instances.", len(unused_instances))
             return unused_instances
         except Exception as e:
             logger.error(f"Error during RDS scan: {e}")
             return []
+
+    def _check_instance(self, cloudwatch_client, instance, current_time):
+        """Analyze a single RDS instance and return its details if it is unused, else None."""
+        instance_id = instance["DBInstanceIdentifier"]
+        cluster_id = instance.get("DBClusterIdentifier", None)
+        logger.debug("Checking RDS instance %s for usage...", instance_id)
+
+        creation_time = instance["InstanceCreateTime"]
+        start_time = determine_metric_time_window(creation_time, current_time, DAYS_THRESHOLD)
+
+        # Fetch all four metrics with a single GetMetricData request (note: each is a NumPy array of values).
+        # The reported CPU and connections are sums of hourly averages and maxima, so they keep hourly values.
+        # A Sum over the whole window equals the sum of its hourly Sums, so the IOPS use a single period instead
+        window_period = max(DAYS_THRESHOLD * 86400, METRIC_PERIOD)
+        cpu_usage, connections, read_iops, write_iops = fetch_metrics(
+            cloudwatch_client, "AWS/RDS", instance_id, "DBInstanceIdentifier",
+            [
+                ("CPUUtilization", "Average"),
+                ("DatabaseConnections", "Maximum"),
+                ("ReadIOPS", "Sum", window_period),
+                ("WriteIOPS", "Sum", window_period),
+            ],
+            start_time, current_time,
+        )
+
+        # Reduce each metric series once; the totals are reused by the conditions and the report
+        cpu_usage_total = cpu_usage.sum()
+        connections_total = connections.sum()
+        read_iops_total = read_iops.sum()
+        write_iops_total = write_iops.sum()
+        iops_total = read_iops_total + write_iops_total
+
+        # Define unused conditions based on the summed metrics
+        unused_conditions = [
+            ("No active connections.", lambda: connections_total == 0),
+            (lambda: f"Low CPU utilization ({cpu_usage_total}%)", lambda: cpu_usage_total < 1),
+            ("No read/write I/O activity.", lambda: iops_total == 0)
+        ]
+
+        reason = determine_unused_reason(unused_conditions)
+        if not reason:
+            return None
+
+        logger.debug("RDS instance %s is unused or underutilized: %s", instance_id, reason)
+        return {
+            "ResourceName": instance_id,
+            "ResourceId": cluster_id,
+            "DBInstanceClass": instance["DBInstanceClass"],
+            "Engine": instance["Engine"],
+            "InstanceCreateTime": creation_time,
+            "Connections": connections_total,
+            "CPUUsage": cpu_usage_total,
+            "ReadIOPS": read_iops_total,
+            "WriteIOPS": write_iops_total,
+            "Reason": reason
+        }
@@ -50,7 +50,7 @@ class SecurityGroupScanner(ResourceScannerRegistry):
                         "Reason": sg["Reason"]
                     })
 
-            logger.info(f"Found {len(unused_groups)} unused Security Groups.")
+            logger.info("Found %s unused Security Groups.", len(unused_groups))
             return unused_groups
 
         except Exception as e:
@@ -34,10 +34,10 @@ class VPCScanner(ResourceScannerRegistry):
                 vpc_name = extract_tag_value(vpc.get("Tags", []), "Name", vpc_id)
                 is_default = vpc.get("IsDefault", False)
 
-                logger.debug(f"Scanning VPC {vpc_id}...")
+                logger.debug("Scanning VPC %s...", vpc_id)
 
                 if is_default:
-                    logger.debug(f"Skipping default VPC {vpc_id}.")
+                    logger.debug("Skipping default VPC %s.", vpc_id)
                     continue
 
                 # Scan the VPC for unused resources
@@ -46,7 +46,7 @@ class VPCScanner(ResourceScannerRegistry):
                 if unused_vpc:
                     unused_vpcs.append(unused_vpc)
 
-            logger.info(f"Found {len(unused_vpcs)} unused VPCs.")
+            logger.info("Found %s unused VPCs.", len(unused_vpcs))
             return unused_vpcs
 
         except Exception as e:
@@ -66,7 +66,7 @@ class VPCScanner(ResourceScannerRegistry):
 
             # If there are no resources, mark the VPC as unused
             if resource_count == 0:
-                logger.debug(f"VPC {vpc_id} has no resources. Marking as unused.")
+                logger.debug("VPC %s has no resources. Marking as unused.", vpc_id)
                 return {"ResourceId": vpc_id, "ResourceName": vpc_name, "Resources": resource_count, "Reason": "No Resources"}
 
             return None
@@ -83,10 +83,12 @@ class VPCScanner(ResourceScannerRegistry):
         :param vpc_id: VPC ID to scan.
         :return: Total number of resources associated with the VPC.
         """
-        logger.debug(f"Counting resources for VPC {vpc_id}...")
+        logger.debug("Counting resources for VPC %s...", vpc_id)
         try:
-            instances = ec2_client.describe_instances(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["Reservations"]
-            return sum(len(res["Instances"]) for res in instances)
+            # A single DescribeInstances call returns at most one page, so every page is counted
+            paginator = ec2_client.get_paginator("describe_instances")
+            pages = paginator.paginate(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])
+            return sum(len(reservation["Instances"]) for page in pages for reservation in page["Reservations"])
         except Exception as e:
             logger.error(f"Error counting resources for VPC {vpc_id}: {e}")
             return 0
@@ -1,11 +1,20 @@
 import boto3
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
+from config.config import MAX_CONCURRENT_REQUESTS
 from utils.logger import get_logger
 import os
 
 logger = get_logger(__name__)
 
+# Back off adaptively when throttled, and size the connection pool for the concurrent requests of a scanner
+CLIENT_CONFIG = Config(
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    max_pool_connections=MAX_CONCURRENT_REQUESTS,
+)
+
 class AWSSessionManager:
     """
     Manages AWS sessions, including assuming roles, switching regions, and creating new sessions.
@@ -28,7 +37,8 @@ class AWSSessionManager:
         self.account_id = account_id
         self._session = None
         self._organization_session = None
-        self.account_id = None
+        self._clients = {}
+        self._clients_lock = threading.Lock()
 
         if self.organization_role:
             logger.debug(f"Automatically assuming organization role {self.organization_role}")
@@ -37,6 +47,38 @@ class AWSSessionManager:
             self.regions = self.get_regions()
             logger.debug(f"Regions: {self.regions}")            
 
+    def __getstate__(self) -> dict:
+        """
+        Prepare the session manager for pickling, e.g. to hand it to a worker process.
+        boto3 sessions, clients and locks cannot be pickled, so only the frozen credentials are kept. The
+        restored session cannot refresh them, so it stops working once assumed-role credentials expire.
+
+        Returns:
+            dict: The picklable state of the session manager.
+        """
+        state = self.__dict__.copy()
+        credentials = self.get_session().get_credentials().get_frozen_credentials()
+        state["_credentials"] = (credentials.access_key, credentials.secret_key, credentials.token)
+        state.update(_session=None, _organization_session=None, _clients={}, _clients_lock=None)
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Restore a pickled session manager, recreating its boto3 session from the frozen credentials.
+
+        Args:
+            state (dict): The state returned by __getstate__.
+        """
+        access_key, secret_key, token = state.pop("_credentials")
+        self.__dict__.update(state)
+        self._clients_lock = threading.Lock()
+        self._session = boto3.Session(
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            aws_session_token=token,
+            region_name=self.region_name
+        )
+
     def get_session(self) -> boto3.Session:
         """
         Get or create a boto3 session.
@@ -314,6 +356,7 @@ class AWSSessionManager:
     def get_client(self, service_name: str) -> boto3.client:
         """
         Get a boto3 client for a specified AWS service using the current session.
+        Clients are created once per service and reused, since they are thread-safe.
 
         Args:
             service_name (str): The AWS service name (e.g., 'sts', 'ec2').
@@ -322,8 +365,12 @@ class AWSSessionManager:
             boto3.client: The AWS service client.
         """
         logger.debug(f"Getting client for service: {service_name}")
-        session = self.get_session()
-        return session.client(service_name)
+        with self._clients_lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                client = self.get_session().client(service_name, config=CLIENT_CONFIG)
+                self._clients[service_name] = client
+        return client
 
     def resolve_role_arn(self, role_name: str, account_id: str) -> str:
         """
@@ -1,4 +1,58 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
+import numpy as np
+from config.config import MAX_CONCURRENT_REQUESTS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fully paginated describe results shared by the scanners of the same account and region
+_describe_cache = {}
+_describe_cache_lock = threading.Lock()
+# Number of seconds a cached describe result is reused
+DESCRIBE_CACHE_TTL = 60
+
+# Granularity of every CloudWatch metric query, in seconds
+METRIC_PERIOD = 3600
+# Maximum number of queries GetMetricData accepts in a single request
+MAX_METRIC_DATA_QUERIES = 500
+
+def cached_describe(client, operation_name, result_key, cache_key, page_size, ttl=DESCRIBE_CACHE_TTL):
+    """
+    Retrieve every item of a paginated describe operation, reusing the items fetched for the same key within ttl seconds.
+    Concurrent callers asking for the same key wait for a single fetch.
+
+    :param client: Boto3 client exposing the operation.
+    :param operation_name: The paginated operation (e.g., 'describe_volumes').
+    :param result_key: The key holding the items of each page (e.g., 'Volumes').
+    :param cache_key: Identifies the account and region the items belong to.
+    :param page_size: The number of items requested per page.
+    :param ttl: The number of seconds the items are reused.
+    :return: A list of items.
+    """
+    with _describe_cache_lock:
+        # Drop the expired items of other accounts and regions, so a long sweep does not keep every region's items
+        now = time.monotonic()
+        for key in [
+            key for key, entry in _describe_cache.items()
+            if entry["items"] is not None and now >= entry["expires"] and not entry["lock"].locked()
+        ]:
+            del _describe_cache[key]
+        entry = _describe_cache.setdefault((operation_name, cache_key), {"lock": threading.Lock(), "expires": 0, "items": None})
+
+    with entry["lock"]:
+        if entry["items"] is None or time.monotonic() >= entry["expires"]:
+            paginator = client.get_paginator(operation_name)
+            entry["items"] = [
+                item
+                for page in paginator.paginate(PaginationConfig={"PageSize": page_size})
+                for item in page[result_key]
+            ]
+            entry["expires"] = time.monotonic() + ttl
+        return entry["items"]
+
 
 def determine_metric_time_window(resource_creation_time, current_time, days_threshold):
     """
@@ -12,7 +66,31 @@ def determine_metric_time_window(resource_creation_time, current_time, days_thre
     return max(current_time - timedelta(days=days_threshold), resource_creation_time)
 
 
-def fetch_metric(cloudwatch_client, namespace, resource_name, dimension_name, metric_name, stat, start_time, end_time):
+def build_metric_query(query_id, namespace, metric_name, dimensions, stat, period=METRIC_PERIOD):
+    """
+    Build a single GetMetricData query.
+
+    :param query_id: The Id of the query, used to match it with its result.
+    :param namespace: AWS CloudWatch namespace (e.g., AWS/EC2, AWS/DynamoDB).
+    :param metric_name: The name of the metric to query.
+    :param dimensions: The dimensions of the metric, shared between the queries of the same resource.
+    :param stat: The statistic type (e.g., Sum, Average).
+    :param period: The granularity of the returned values in seconds, a multiple of 60.
+    :return: A MetricDataQuery dictionary.
+    """
+    return {
+        'Id': query_id,
+        'MetricStat': {
+            'Metric': {'Namespace': namespace, 'MetricName': metric_name, 'Dimensions': dimensions},
+            'Period': period,
+            'Stat': stat,
+        },
+        'ReturnData': True,
+    }
+
+
+def fetch_metric(cloudwatch_client, namespace, resource_name, dimension_name, metric_name, stat, start_time, end_time,
+                 period=METRIC_PERIOD):
     """
     Fetch CloudWatch metrics for a given resource and return a list of values instead of a single sum.
 
@@ -24,47 +102,114 @@ def fetch_metric(cloudwatch_client, namespace, resource_name, dimension_name, me
     :param stat: The statistic type (e.g., Sum, Average).
     :param start_time: The start time for the metric query.
     :param end_time: The end time for the metric query.
-    :return: A list of metric values or an empty list if no data is available.
+    :param period: The granularity of the returned values in seconds; a period spanning the whole window returns one aggregated value.
+    :return: A NumPy array of metric values, empty if no data is available.
     """
+    return fetch_metrics(
+        cloudwatch_client, namespace, resource_name, dimension_name, [(metric_name, stat)], start_time, end_time, period
+    )[0]
+
+
+def fetch_metrics(cloudwatch_client, namespace, resource_name, dimension_name, metric_stats, start_time, end_time,
+                  period=METRIC_PERIOD):
+    """
+    Fetch several CloudWatch metrics for a given resource with a single GetMetricData request.
+
+    :param cloudwatch_client: Boto3 CloudWatch client.
+    :param namespace: AWS CloudWatch namespace (e.g., AWS/EC2, AWS/DynamoDB).
+    :param resource_name: The name of the resource (e.g., InstanceId or TableName).
+    :param dimension_name: The dimension name (e.g., 'InstanceId', 'TableName').
+    :param metric_stats: A list of (metric_name, stat) tuples to query, or (metric_name, stat, period) tuples to
+                         override the period of a single metric.
+    :param start_time: The start time for the metric query.
+    :param end_time: The end time for the metric query.
+    :param period: The granularity of the returned values in seconds; a period spanning the whole window returns one aggregated value.
+    :return: A list of NumPy arrays of metric values, in the same order as metric_stats.
+    """
+    metric_stats = [
+        (metric_stat[0], metric_stat[1], metric_stat[2] if len(metric_stat) > 2 else period) for metric_stat in metric_stats
+    ]
+    # Align the start to the hour so hourly values cover whole hours; the end is kept as is, so the latest
+    # partial hour is included and resources created within the hour still get a non-empty window
+    start_time = start_time.replace(minute=0, second=0, microsecond=0)
+    dimensions = [{'Name': dimension_name, 'Value': resource_name}]
     try:
         metric_data = cloudwatch_client.get_metric_data(
-            MetricDataQueries=[{
-                'Id': f'{metric_name.lower()}Query',
-                'MetricStat': {
-                    'Metric': {
-                        'Namespace': namespace,
-                        'MetricName': metric_name,
-                        'Dimensions': [{'Name': dimension_name, 'Value': resource_name}],
-                    },
-                    'Period': 3600,  # 1-hour granularity, adjust as needed
-                    'Stat': stat,
-                },
-                'ReturnData': True,
-            }],
+            MetricDataQueries=[
+                build_metric_query(f'q{index}', namespace, metric_name, dimensions, stat, metric_period)
+                for index, (metric_name, stat, metric_period) in enumerate(metric_stats)
+            ],
             StartTime=start_time,
             EndTime=end_time,
-        )['MetricDataResults'][0]['Values']
-        
-        return metric_data  # Return the list of values (empty if no data available)
-    
+        )['MetricDataResults']
+    except Exception as e:
+        metric_names = ", ".join(metric_name for metric_name, _, _ in metric_stats)
+        logger.error(f"Error fetching metrics {metric_names} for {resource_name}: {e}")
+        metric_data = []
+
+    values_by_id = {result['Id']: result['Values'] for result in metric_data}
+    results = [values_by_id.get(f'q{index}', ()) for index in range(len(metric_stats))]
+    return [np.asarray(values, dtype=np.float64) for values in results]  # Empty arrays where no data is available
+
+def fetch_metrics_batch(cloudwatch_client, metric_queries, start_time, end_time):
+    """
+    Fetch many CloudWatch metric queries, possibly across resources, with as few GetMetricData requests as possible.
+
+    :param cloudwatch_client: Boto3 CloudWatch client.
+    :param metric_queries: A list of MetricDataQuery dictionaries with unique Ids (see build_metric_query).
+    :param start_time: The start time for the metric queries.
+    :param end_time: The end time for the metric queries.
+    :return: A dictionary mapping each query Id to a NumPy array of its values, empty if no data is available.
+             The Ids of the queries whose request failed are left out, so that missing metrics can be told
+             apart from metrics without data.
+    """
+    chunks = [
+        metric_queries[offset:offset + MAX_METRIC_DATA_QUERIES]
+        for offset in range(0, len(metric_queries), MAX_METRIC_DATA_QUERIES)
+    ]
+    values_by_id = {}
+    # Each request is bound by network latency, so the chunks are fetched concurrently
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        for chunk_values in executor.map(
+            lambda chunk: _fetch_metric_data_chunk(cloudwatch_client, chunk, start_time, end_time), chunks
+        ):
+            values_by_id.update(chunk_values)
+
+    return {query_id: np.asarray(values, dtype=np.float64) for query_id, values in values_by_id.items()}
+
+def _fetch_metric_data_chunk(cloudwatch_client, metric_queries, start_time, end_time):
+    """
+    Fetch the values of up to MAX_METRIC_DATA_QUERIES queries with one GetMetricData request, following NextToken.
+    Returns an empty dictionary if the request fails.
+    """
+    values_by_id = {query['Id']: [] for query in metric_queries}
+    request = {'MetricDataQueries': metric_queries, 'StartTime': start_time, 'EndTime': end_time}
+    try:
+        while True:
+            response = cloudwatch_client.get_metric_data(**request)
+            for result in response['MetricDataResults']:
+                values_by_id[result['Id']].extend(result['Values'])
+            if not response.get('NextToken'):
+                break
+            request['NextToken'] = response['NextToken']
     except Exception as e:
-        # Log error in your logger system
-        print(f"Error fetching metric {metric_name} for {resource_name}: {e}")
-        return []  # Return an empty list if there was an error
+        logger.error(f"Error fetching a batch of {len(metric_queries)} metric queries: {e}")
+        return {}
+    return values_by_id
 
-def determine_unused_reason(metric_values, unused_conditions):
+def determine_unused_reason(unused_conditions):
     """
-    Determine if a resource is unused based on its metric values and conditions.
+    Determine if a resource is unused based on lazily evaluated conditions.
 
-    :param metric_values: A dictionary of metric values (e.g., CPU, network, etc.).
-    :param unused_conditions: A list of conditions to evaluate for marking the resource as unused.
-                              Each condition is a callable that returns a tuple (is_unused: bool, reason: str).
-    :return: The reason for being unused if applicable, else None.
+    :param unused_conditions: A list of (reason, predicate) tuples evaluated in order. The predicate is a
+                              callable taking no arguments, or a plain boolean when it is cheap to compute
+                              upfront; the reason is a string, or a callable returning one so that it is only
+                              formatted when its predicate holds.
+    :return: The reason of the first condition that holds, else None.
     """
-    for condition in unused_conditions:
-        is_unused, reason = condition(metric_values)
-        if is_unused:
-            return reason
+    for reason, predicate in unused_conditions:
+        if predicate() if callable(predicate) else predicate:
+            return reason() if callable(reason) else reason
     return None
 
 def extract_tag_value(tags, key, default="Unnamed"):
@@ -79,10 +224,7 @@ def extract_tag_value(tags, key, default="Unnamed"):
     if not tags:
         return default
 
-    for tag in tags:
-        if tag["Key"] == key:
-            return tag["Value"]
-    return default
+    return next((tag["Value"] for tag in tags if tag["Key"] == key), default)
 
 
 def calculate_and_format_age_in_time_units(current_time: datetime, creation_time: datetime) -> str:
@@ -1,19 +1,28 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from scanner.aws.account_scanner import AWSAccountScanner
 from scanner.aws.session_manager import AWSSessionManager
+from scanner.resource_scanner_registry import ResourceScannerRegistry
 from utils.logger import get_logger
+from pathlib import Path
 import os
 import time
 
 logger = get_logger(__name__)
 
+# The scanner modules, located from this package rather than the working directory of the worker processes
+SERVICES_DIR = Path(__file__).parent / "aws" / "services"
+SERVICES_PACKAGE = f"{__package__}.aws.services"
+
 class Executor:
-    def __init__(self, session: AWSSessionManager, accounts: list = [], scanners: list = [], regions: list = [], max_workers: int = 10):
+    def __init__(self, session: AWSSessionManager, accounts: list = [], scanners: list = [], regions: list = [], max_workers: int = 10,
+                 use_processes: bool = False):
         self.session = session
         self.regions = regions
         self.scanners = scanners
         self.accounts = accounts
         self.max_workers = max_workers
+        self.use_processes = use_processes
         if not self.max_workers:
             self.max_workers = (os.cpu_count() - 1)
 
@@ -36,49 +45,41 @@ class Executor:
         logger.info(f"Retrieved {len(sessions)} sessions for scanning.")
         logger.debug(f"Scanners to be used: {self.scanners}")
 
-        scanner = AWSAccountScanner(self.session)
+        # Collect the account-region-scanner tasks, grouped by account
+        tasks_by_account = defaultdict(list)
+        for session in sessions:
+            # Here we assume that the session provides the account_id and account_name directly
+            account_id = session.get_account_id()
+            account_name = next((acc["Name"] for acc in self.accounts if str(acc["Id"]) == str(account_id)), None)
+            # If the account_id is not in the list of accounts, skip the iteration
+            if self.accounts and not any(acc["Id"] == str(account_id) for acc in self.accounts):
+                logger.info(f"Account ID {account_id} is not in the specified accounts list. Skipping...")
+                continue  # Skip the current iteration if the account_id is not found in the accounts list
+
+            regions = self._get_regions_for_session(session)
+            logger.debug(f"Regions for scanning: {regions}")
+            for scanner_name in self.scanners:
+                if scanner_name.startswith("iam"):
+                    # Only scan IAM once per account (using the 'Global' region)
+                    tasks_by_account[account_id].append((session, account_id, account_name, 'Global', scanner_name))
+                else:
+                    # Scan all regions for non-IAM resource types
+                    for region in regions:
+                        tasks_by_account[account_id].append((session, account_id, account_name, region, scanner_name))
+
+        if self.use_processes:
+            scan_results = self._execute_in_processes(tasks_by_account)
+        else:
+            scanner = AWSAccountScanner(self.session)
+            scan_results = _scan_tasks(scanner, [task for tasks in tasks_by_account.values() for task in tasks], self.max_workers)
 
-        # Using ThreadPoolExecutor for account-region-scanner parallelism
         results = []
-        logger.debug(f"Using {self.max_workers} Threads")
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-            for session in sessions:
-                # Here we assume that the session provides the account_id and account_name directly
-                account_id = session.get_account_id()
-                account_name = next((acc["Name"] for acc in self.accounts if str(acc["Id"]) == str(account_id)), None)
-                # If the account_id is not in the list of accounts, skip the iteration
-                if self.accounts and not any(acc["Id"] == str(account_id) for acc in self.accounts):
-                    logger.info(f"Account ID {account_id} is not in the specified accounts list. Skipping...")
-                    continue  # Skip the current iteration if the account_id is not found in the accounts list
-
-                regions = self._get_regions_for_session(session)
-                logger.debug(f"Regions for scanning: {regions}")
-                for scanner_name in self.scanners:
-                    if scanner_name.startswith("iam"):
-                        # Only scan IAM once per account (using the 'Global' region)
-                        futures.append(
-                            executor.submit(self._scan_region_scanner, scanner, session, account_id, account_name, 'Global', scanner_name)
-                        )
-                    else:
-                        # Scan all regions for non-IAM resource types
-                        for region in regions:
-                            futures.append(
-                                executor.submit(self._scan_region_scanner, scanner, session, account_id, account_name,region, scanner_name)
-                            )
-
-            logger.debug(f"Submitted {len(futures)} scanning tasks to executor.")
-
-            # Collect and process results
-            for future in as_completed(futures):
-                try:
-                    result = future.result()  # This will re-raise exceptions if any occurred
-                    if result:
-                        results.append(result)
-                        # Update scan metrics
-                        self.total_scans += 1
-                except Exception as e:
-                    logger.error(f"Error during scan execution: {e}")
+        for result in scan_results:
+            if result:
+                results.append(result)
+                # Update scan metrics
+                self.total_scans += 1
+
         # End time
         self.end_time = time.time()
         logger.info("Scan execution completed.")
@@ -98,6 +99,33 @@ class Executor:
 
         return results, self.scan_metrics
 
+    def _execute_in_processes(self, tasks_by_account):
+        """
+        Scan each account in its own worker process, so response parsing is spread over the CPUs instead of
+        contending for a single GIL. The tasks of an account still run on threads within its worker process.
+        Sessions reach the workers with frozen credentials (see AWSSessionManager.__getstate__), which are not
+        refreshed, so assumed-role credentials must outlive the scan.
+
+        :param tasks_by_account: A dictionary mapping account IDs to their (session, account_id, account_name, region, scanner_name) tasks.
+        :return: The scan results of all the accounts.
+        """
+        max_processes = max(min(self.max_workers, os.cpu_count() or 1, len(tasks_by_account)), 1)
+        logger.debug(f"Using {max_processes} Processes")
+        results = []
+        with ProcessPoolExecutor(max_workers=max_processes) as executor:
+            futures = {
+                executor.submit(_scan_account_in_process, tasks, self.max_workers): account_id
+                for account_id, tasks in tasks_by_account.items()
+            }
+            logger.debug(f"Submitted {len(futures)} account scans to executor.")
+
+            for future in as_completed(futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Error during scan execution of account {futures[future]}: {e}")
+        return results
+
     def _get_regions_for_session(self, session):
         """
         Determine the regions to process for the given session.
@@ -106,7 +134,8 @@ class Executor:
             return session.get_regions()
         return [region for region in session.get_regions() if region in self.regions]
 
-    def _scan_region_scanner(self, scanner, session, account_id, account_name, region, scanner_name):
+    @staticmethod
+    def _scan_region_scanner(scanner, session, account_id, account_name, region, scanner_name):
         """
         Perform a scan for a specific scanner in a specific region.
 
@@ -125,3 +154,42 @@ class Executor:
         except Exception as e:
             logger.error(f"Error scanning account {account_id} in region {region} with scanner {scanner_name}: {e}")
             return None
+
+
+def _scan_tasks(scanner, tasks, max_workers):
+    """
+    Run account-region-scanner tasks on a thread pool.
+
+    :param scanner: AWSAccountScanner instance.
+    :param tasks: A list of (session, account_id, account_name, region, scanner_name) tuples.
+    :param max_workers: The maximum number of threads.
+    :return: The scan results, None for the tasks that failed.
+    """
+    results = []
+    logger.debug(f"Using {max_workers} Threads")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(Executor._scan_region_scanner, scanner, *task) for task in tasks]
+        logger.debug(f"Submitted {len(futures)} scanning tasks to executor.")
+
+        # Collect and process results
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())  # This will re-raise exceptions if any occurred
+            except Exception as e:
+                logger.error(f"Error during scan execution: {e}")
+    return results
+
+
+def _scan_account_in_process(tasks, max_workers):
+    """
+    Entry point of a worker process scanning a single account.
+
+    :param tasks: The (session, account_id, account_name, region, scanner_name) tuples of the account.
+    :param max_workers: The maximum number of threads within the worker process.
+    :return: The scan results of the account.
+    """
+    # Worker processes that are spawned rather than forked start with an empty registry
+    if not ResourceScannerRegistry.list_scanners():
+        ResourceScannerRegistry.register_scanners_from_directory(str(SERVICES_DIR), package=SERVICES_PACKAGE)
+    scanner = AWSAccountScanner(tasks[0][0])
+    return _scan_tasks(scanner, tasks, max_workers)
@@ -90,11 +90,13 @@ class ResourceScannerRegistry(ABC):
         return argument_names
 
     @classmethod
-    def register_scanners_from_directory(cls, scanner_dir: str):
+    def register_scanners_from_directory(cls, scanner_dir: str, package: str = None):
         """
         Automatically discovers and registers all scanner classes in a given directory.
 
         :param scanner_dir: Directory path where scanner modules are located.
+        :param package: Dotted name of the package of the scanner modules; defaults to scanner_dir read as a
+                        dotted path, which requires scanner_dir to be relative to the working directory.
         """
         scanner_path = Path(scanner_dir)
         
@@ -111,7 +113,7 @@ class ResourceScannerRegistry(ABC):
                     module_name = filename[:-3]  # Strip the ".py" extension
                     try:
                         # Dynamically import the module
-                        module = importlib.import_module(f"{scanner_dir.replace(os.sep, '.')}.{module_name}")
+                        module = importlib.import_module(f"{package or scanner_dir.replace(os.sep, '.')}.{module_name}")
                         
                         # Iterate over all classes in the module
                         for name, obj in inspect.getmembers(module, inspect.isclass):
@@ -135,6 +137,8 @@ class ResourceScannerRegistry(ABC):
     def scan(self, *args, **kwargs):
         """
         Abstract method to scan resources. Must be implemented by subclasses.
+        Scanners may run concurrently in separate threads, so implementations must not
+        keep mutable state outside of the scan call other than logging.
         """
         pass
 
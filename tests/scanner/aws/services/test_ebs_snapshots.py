@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatchcase
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from scanner.aws.services.ebs_snapshots import EbsSnapshotScanner, FIRST_SNAPSHOT_YEAR
+
+REJECTED_FILTER_ERROR = ClientError({"Error": {"Code": "InvalidParameterValue", "Message": "Invalid filter"}}, "DescribeSnapshots")
+
+
+@pytest.fixture
+def scanner():
+    """Fixture to create an EbsSnapshotScanner."""
+    return EbsSnapshotScanner()
+
+
+def test_start_time_filter_values(scanner):
+    """Test that the start-time patterns list past years, past months of the cutoff year and days up to the cutoff."""
+    values = scanner._start_time_filter_values(datetime(2026, 3, 5, 18, tzinfo=timezone.utc))
+
+    assert values == (
+        [f"{year}-*" for year in range(FIRST_SNAPSHOT_YEAR, 2026)]
+        + ["2026-01-*", "2026-02-*"]
+        + ["2026-03-01*", "2026-03-02*", "2026-03-03*", "2026-03-04*", "2026-03-05*"]
+    )
+
+
+@pytest.mark.parametrize("cutoff_time", [
+    datetime(2026, 1, 1, tzinfo=timezone.utc),
+    datetime(2026, 3, 5, 18, tzinfo=timezone.utc),
+    datetime(2024, 12, 31, 23, 59, tzinfo=timezone.utc),
+], ids=["first-day-of-year", "mid-year", "last-day-of-leap-year"])
+def test_start_time_filter_values_match_days_up_to_cutoff(scanner, cutoff_time):
+    """Test that the patterns match every start time up to the end of the cutoff day, and none after it."""
+    values = scanner._start_time_filter_values(cutoff_time)
+    cutoff_day = cutoff_time.date()
+
+    day = datetime(FIRST_SNAPSHOT_YEAR, 1, 1, 12, tzinfo=timezone.utc)
+    while day.date() <= cutoff_day + timedelta(days=40):
+        start_time = day.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        matched = any(fnmatchcase(start_time, value) for value in values)
+        assert matched == (day.date() <= cutoff_day), start_time
+        day += timedelta(days=1)
+
+
+def test_iter_snapshot_pages_filters_on_start_time(scanner):
+    """Test that owned snapshots are listed with the start-time filter."""
+    ec2_client = MagicMock()
+    paginator = ec2_client.get_paginator.return_value
+    paginator.paginate.return_value = [{"Snapshots": [{"SnapshotId": "snap-1"}]}, {"Snapshots": [{"SnapshotId": "snap-2"}]}]
+    cutoff_time = datetime(2026, 3, 5, tzinfo=timezone.utc)
+
+    pages = list(scanner._iter_snapshot_pages(ec2_client, cutoff_time))
+
+    assert pages == [[{"SnapshotId": "snap-1"}], [{"SnapshotId": "snap-2"}]]
+    paginator.paginate.assert_called_once_with(
+        OwnerIds=["self"],
+        Filters=[{"Name": "start-time", "Values": scanner._start_time_filter_values(cutoff_time)}],
+        PaginationConfig={"PageSize": 1000},
+    )
+
+
+def test_iter_snapshot_pages_falls_back_without_filter(scanner):
+    """Test that a rejected start-time filter falls back to listing every owned snapshot."""
+    ec2_client = MagicMock()
+    paginator = ec2_client.get_paginator.return_value
+    paginator.paginate.side_effect = [REJECTED_FILTER_ERROR, [{"Snapshots": [{"SnapshotId": "snap-1"}]}]]
+
+    pages = list(scanner._iter_snapshot_pages(ec2_client, datetime(2026, 3, 5, tzinfo=timezone.utc)))
+
+    assert pages == [[{"SnapshotId": "snap-1"}]]
+    assert paginator.paginate.call_args.kwargs == {"OwnerIds": ["self"], "PaginationConfig": {"PageSize": 1000}}
+
+
+def test_iter_snapshot_pages_does_not_retry_after_a_page(scanner):
+    """Test that an error after a page was yielded is raised instead of listing the snapshots twice."""
+    def failing_pages():
+        yield {"Snapshots": [{"SnapshotId": "snap-1"}]}
+        raise REJECTED_FILTER_ERROR
+
+    ec2_client = MagicMock()
+    ec2_client.get_paginator.return_value.paginate.return_value = failing_pages()
+    pages = scanner._iter_snapshot_pages(ec2_client, datetime(2026, 3, 5, tzinfo=timezone.utc))
+
+    assert next(pages) == [{"SnapshotId": "snap-1"}]
+    with pytest.raises(ClientError):
+        next(pages)
+    ec2_client.get_paginator.return_value.paginate.assert_called_once()
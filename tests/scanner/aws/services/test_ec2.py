@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from scanner.aws.services.ec2 import Ec2Scanner, ACTIVITY_METRICS, CPU_METRICS, DAYS_THRESHOLD
+
+CURRENT_TIME = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scanner():
+    """Fixture to create an Ec2Scanner with a mocked cost estimator."""
+    with patch("scanner.aws.services.ec2.CostEstimator"):
+        yield Ec2Scanner()
+
+
+@pytest.mark.parametrize("state_transition_reason", [
+    "User initiated (2026-01-01 00:00:00 GMT)",
+    "User initiated (2026-01-01T00:00:00+00:00)",
+    "User initiated (Jan 1 2026 01:00:00 +0100)",
+], ids=["usual-format", "iso-format", "other-timezone"])
+def test_state_change_duration_parses_timestamps(scanner, state_transition_reason):
+    """Test that the state change duration falls back to the generic parser for unusual timestamps."""
+    instance = {"StateTransitionReason": state_transition_reason}
+
+    assert scanner._calculate_state_change_duration(instance, CURRENT_TIME) == 30
+
+
+@pytest.mark.parametrize("state_transition_reason", [None, "", "User initiated", "User initiated (not a date)"])
+def test_state_change_duration_without_timestamp(scanner, state_transition_reason):
+    """Test that a StateTransitionReason without a valid timestamp gives no duration."""
+    instance = {"StateTransitionReason": state_transition_reason}
+
+    assert scanner._calculate_state_change_duration(instance, CURRENT_TIME) is None
+
+
+def test_busy_cpu_mask(scanner):
+    """Test that only instances with an average CPU usage at or above the threshold are busy."""
+    cpu_series = [np.array([5.0, 3.0]), np.array([1.0, 2.5]), np.zeros(0), np.array([2.0])]
+
+    assert scanner._busy_cpu_mask(cpu_series).tolist() == [True, False, False, True]
+
+
+def test_check_instances_usage_batched(scanner):
+    """Test that the metrics of every instance are fetched in one request over a whole-hour window."""
+    cloudwatch_client = MagicMock()
+    cloudwatch_client.get_metric_data.side_effect = lambda MetricDataQueries, **kwargs: {
+        "MetricDataResults": [
+            {"Id": query["Id"], "Values": [float(index)]} for index, query in enumerate(MetricDataQueries)
+        ]
+    }
+    instances = [{"InstanceId": "i-1"}, {"InstanceId": "i-2"}]
+    current_time = datetime(2026, 1, 31, 12, 34, 56, tzinfo=timezone.utc)
+
+    usage_by_instance = scanner._check_instances_usage_batched(cloudwatch_client, instances, current_time, ACTIVITY_METRICS)
+
+    cloudwatch_client.get_metric_data.assert_called_once()
+    request = cloudwatch_client.get_metric_data.call_args.kwargs
+    assert request["EndTime"] == datetime(2026, 1, 31, 12, tzinfo=timezone.utc)
+    assert request["StartTime"] == request["EndTime"] - timedelta(days=DAYS_THRESHOLD)
+    assert {query["MetricStat"]["Period"] for query in request["MetricDataQueries"]} == {DAYS_THRESHOLD * 86400}
+    assert list(usage_by_instance) == ["i-1", "i-2"]
+    assert {prefix: values.tolist() for prefix, values in usage_by_instance["i-2"].items()} == {
+        "net_in": [4.0], "net_out": [5.0], "ebs_read": [6.0], "ebs_write": [7.0],
+    }
+
+
+def test_check_instances_usage_batched_without_instances(scanner):
+    """Test that no request is sent when there is no instance to check."""
+    cloudwatch_client = MagicMock()
+
+    assert scanner._check_instances_usage_batched(cloudwatch_client, [], CURRENT_TIME, CPU_METRICS) == {}
+    cloudwatch_client.get_metric_data.assert_not_called()
+
+
+def test_check_instances_usage_batched_with_failed_request(scanner):
+    """Test that metrics whose request failed are returned empty, so they flag nothing."""
+    cloudwatch_client = MagicMock()
+    cloudwatch_client.get_metric_data.side_effect = Exception("Throttling")
+
+    usage_by_instance = scanner._check_instances_usage_batched(
+        cloudwatch_client, [{"InstanceId": "i-1"}], CURRENT_TIME, CPU_METRICS
+    )
+
+    assert usage_by_instance["i-1"]["cpu"].size == 0
+    assert scanner._busy_cpu_mask([usage_by_instance["i-1"]["cpu"]]).tolist() == [False]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from scanner.aws.services.elb import ElbScanner
+
+LB_ARN = "arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/idle-lb/1234567890abcdef"
+
+
+@pytest.fixture
+def clients():
+    """Fixture providing mocked ELBv2 and CloudWatch clients with one Load Balancer."""
+    elbv2_client = MagicMock()
+    elbv2_client.describe_load_balancers.return_value = {
+        "LoadBalancers": [{"LoadBalancerArn": LB_ARN, "LoadBalancerName": "idle-lb"}]
+    }
+    return {"elbv2": elbv2_client, "cloudwatch": MagicMock()}
+
+
+@pytest.fixture
+def session(clients):
+    """Fixture providing a session manager returning the mocked clients."""
+    session = MagicMock()
+    session.get_client.side_effect = lambda service_name: clients[service_name]
+    return session
+
+
+def test_scan_reports_load_balancer_without_traffic(clients, session):
+    """Test that a Load Balancer whose metrics have no datapoints is reported as unused."""
+    clients["cloudwatch"].get_metric_data.side_effect = lambda MetricDataQueries, **kwargs: {
+        "MetricDataResults": [{"Id": query["Id"], "Values": []} for query in MetricDataQueries]
+    }
+
+    unused_lbs = ElbScanner().scan(session)
+
+    assert [lb["ResourceId"] for lb in unused_lbs] == [LB_ARN]
+    assert unused_lbs[0]["Reason"].startswith("No traffic recorded")
+
+
+def test_scan_skips_load_balancer_with_unavailable_metrics(clients, session):
+    """Test that a Load Balancer is not reported when its metrics could not be retrieved."""
+    clients["cloudwatch"].get_metric_data.side_effect = ClientError(
+        {"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "GetMetricData"
+    )
+
+    assert ElbScanner().scan(session) == []
+
+
+def test_calculate_request_statistics():
+    """Test that totals and population standard deviations match a per Load Balancer computation."""
+    request_series = [np.array([1.0, 3.0]), np.zeros(0), np.array([0.0, 0.0, 0.0]), np.array([4.0])]
+
+    totals, deviations = ElbScanner()._calculate_request_statistics(request_series)
+
+    assert totals.tolist() == [4.0, 0.0, 0.0, 4.0]
+    # A single datapoint has no deviation, and Load Balancers without requests always have none
+    assert deviations.tolist() == [1.0, 0.0, 0.0, 0.0]
+    np.testing.assert_allclose(deviations[:1], [np.std(request_series[0])])
+
+
+def test_calculate_request_statistics_without_load_balancers():
+    """Test that no Load Balancer gives empty statistics."""
+    totals, deviations = ElbScanner()._calculate_request_statistics([])
+
+    assert totals.size == 0
+    assert deviations.size == 0
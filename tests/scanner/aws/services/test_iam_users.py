@@ -0,0 +1,123 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from scanner.aws.services.iam_users import IAMUserScanner
+
+CURRENT_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scanner():
+    """Fixture to create an IAMUserScanner."""
+    return IAMUserScanner()
+
+
+@pytest.fixture
+def iam_client():
+    """Fixture to mock an IAM client whose only access key was last used 200 days ago."""
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.return_value = [
+        {"AccessKeyMetadata": [{"AccessKeyId": "AKIA1"}]}
+    ]
+    client.get_access_key_last_used.return_value = {
+        "AccessKeyLastUsed": {"LastUsedDate": CURRENT_TIME - timedelta(days=200)}
+    }
+    return client
+
+
+def make_user(last_login_days_ago=None):
+    user = {"UserName": "alice", "Arn": "arn:aws:iam::123456789012:user/alice"}
+    if last_login_days_ago is not None:
+        user["PasswordLastUsed"] = CURRENT_TIME - timedelta(days=last_login_days_ago)
+    return user
+
+
+def test_recent_login_in_report_keeps_stale_key_finding(scanner, iam_client):
+    """Test that a recently active user listed in the credential report is reported for its stale keys."""
+    key_usage_by_user = {"alice": CURRENT_TIME - timedelta(days=200)}
+
+    result = scanner._check_user(iam_client, make_user(last_login_days_ago=1), key_usage_by_user, CURRENT_TIME)
+
+    assert result["Reason"].startswith("Access keys last used")
+    iam_client.get_access_key_last_used.assert_not_called()
+
+
+@pytest.mark.parametrize("key_usage_by_user", [None, {"bob": None}], ids=["report-unavailable", "user-missing-from-report"])
+def test_recent_login_outside_report_skips_key_probe(scanner, iam_client, key_usage_by_user):
+    """Test that the keys of a recently active user are not probed when the report does not cover the user."""
+    result = scanner._check_user(iam_client, make_user(last_login_days_ago=1), key_usage_by_user, CURRENT_TIME)
+
+    assert result is None
+    iam_client.get_access_key_last_used.assert_not_called()
+
+
+@pytest.mark.parametrize("key_usage_by_user", [None, {"bob": None}], ids=["report-unavailable", "user-missing-from-report"])
+def test_inactive_user_outside_report_probes_keys(scanner, iam_client, key_usage_by_user):
+    """Test that the keys of an inactive user are probed when the report does not cover the user."""
+    result = scanner._check_user(iam_client, make_user(last_login_days_ago=120), key_usage_by_user, CURRENT_TIME)
+
+    assert "UI login last used" in result["Reason"]
+    assert "Access keys last used" in result["Reason"]
+    iam_client.get_access_key_last_used.assert_called_once_with(AccessKeyId="AKIA1")
+
+
+def test_credential_report_skips_malformed_rows(scanner, iam_client):
+    """Test that truncated credential report rows are skipped instead of failing the report parsing."""
+    iam_client.generate_credential_report.return_value = {"State": "COMPLETE"}
+    iam_client.get_credential_report.return_value = {"Content": (
+        "user,arn,access_key_1_last_used_date,access_key_2_last_used_date\n"
+        "alice,arn:aws:iam::123456789012:user/alice,2025-06-01T00:00:00+00:00,N/A\n"
+        "bob,arn:aws:iam::123456789012:user/bob\n"
+    ).encode("utf-8")}
+
+    key_usage_by_user = scanner._get_key_usage_from_credential_report(iam_client)
+
+    assert key_usage_by_user == {"alice": datetime(2025, 6, 1, tzinfo=timezone.utc)}
+
+
+def test_credential_report_keeps_latest_key_usage(scanner, iam_client):
+    """Test that the latest usage of either access key is kept, and placeholders mean the keys were never used."""
+    iam_client.generate_credential_report.return_value = {"State": "COMPLETE"}
+    iam_client.get_credential_report.return_value = {"Content": (
+        "user,arn,access_key_1_last_used_date,access_key_2_last_used_date\n"
+        "alice,arn:aws:iam::123456789012:user/alice,2025-06-01T00:00:00+00:00,2025-07-01T00:00:00+00:00\n"
+        "bob,arn:aws:iam::123456789012:user/bob,N/A,no_information\n"
+    ).encode("utf-8")}
+
+    key_usage_by_user = scanner._get_key_usage_from_credential_report(iam_client)
+
+    assert key_usage_by_user == {"alice": datetime(2025, 7, 1, tzinfo=timezone.utc), "bob": None}
+
+
+def test_credential_report_polls_until_complete(scanner, iam_client):
+    """Test that the credential report is polled until its generation completes."""
+    iam_client.generate_credential_report.side_effect = [
+        {"State": "STARTED"}, {"State": "INPROGRESS"}, {"State": "COMPLETE"},
+    ]
+    iam_client.get_credential_report.return_value = {"Content": b"user,access_key_1_last_used_date,access_key_2_last_used_date\n"}
+
+    with patch("scanner.aws.services.iam_users.time.sleep") as mock_sleep:
+        assert scanner._get_key_usage_from_credential_report(iam_client) == {}
+
+    assert iam_client.generate_credential_report.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_credential_report_not_ready_in_time(scanner, iam_client):
+    """Test that a credential report still being generated after every attempt is treated as unavailable."""
+    iam_client.generate_credential_report.return_value = {"State": "INPROGRESS"}
+
+    with patch("scanner.aws.services.iam_users.time.sleep"), \
+            patch("scanner.aws.services.iam_users.CREDENTIAL_REPORT_MAX_ATTEMPTS", 3):
+        assert scanner._get_key_usage_from_credential_report(iam_client) is None
+
+    assert iam_client.generate_credential_report.call_count == 3
+    iam_client.get_credential_report.assert_not_called()
+
+
+def test_credential_report_with_unexpected_columns(scanner, iam_client):
+    """Test that a credential report without the expected columns is treated as unavailable."""
+    iam_client.generate_credential_report.return_value = {"State": "COMPLETE"}
+    iam_client.get_credential_report.return_value = {"Content": b"user,arn\nalice,arn:aws:iam::123456789012:user/alice\n"}
+
+    assert scanner._get_key_usage_from_credential_report(iam_client) is None
@@ -0,0 +1,72 @@
+import boto3
+import pytest
+from unittest.mock import MagicMock, patch
+from moto import mock_aws
+from scanner.aws.services.opensearch import OpenSearchScanner
+
+
+@pytest.fixture
+def aws_session():
+    """Fixture providing a session manager backed by mocked AWS clients."""
+    with mock_aws():
+        session = MagicMock()
+        session.get_client.side_effect = lambda service_name: boto3.client(service_name, region_name="us-east-1")
+        yield session
+
+
+@pytest.fixture
+def scanner():
+    """Fixture to create an OpenSearchScanner with a mocked cost estimator."""
+    with patch("scanner.aws.services.opensearch.CostEstimator") as MockCostEstimator:
+        MockCostEstimator.return_value.calculate_cost.side_effect = [
+            {"hourly": 0.5, "daily": 12.0, "monthly": 360.0, "yearly": 4320.0, "lifetime": 1080.0},
+            {"hourly": 0.1, "daily": 2.4, "monthly": 72.0, "yearly": 864.0, "lifetime": "N/A"},
+        ]
+        yield OpenSearchScanner()
+
+
+def test_scan_reports_unused_domain_with_costs(aws_session, scanner):
+    """Test that a domain without activity is reported with its combined costs."""
+    aws_session.get_client("opensearch").create_domain(
+        DomainName="idle-domain",
+        ClusterConfig={"InstanceType": "t3.small.search", "InstanceCount": 2},
+        EBSOptions={"EBSEnabled": True, "VolumeType": "gp3", "VolumeSize": 20},
+    )
+
+    unused_clusters = scanner.scan(aws_session)
+
+    assert len(unused_clusters) == 1
+    cluster = unused_clusters[0]
+    assert cluster["DomainName"] == "idle-domain"
+    assert cluster["InstanceType"] == "t3.small.search"
+    assert cluster["InstanceCount"] == 2
+    assert cluster["StorageSizeGB"] == 20
+    assert cluster["Reason"] == "No search activity."
+    assert cluster["CreationTime"] == "Unknown"
+    # Without a creation time, the cost over the checked window is reported instead of a lifetime cost
+    assert cluster["WindowCost"] == 1080.0
+    assert cluster["Costs"]["OpenSearch Clusters"] == {
+        "hourly": 0.6, "daily": 14.4, "monthly": 432.0, "yearly": 5184.0, "lifetime": "N/A",
+    }
+
+
+def test_scan_without_domains(aws_session, scanner):
+    """Test that an account without domains reports nothing."""
+    assert scanner.scan(aws_session) == []
+
+
+def test_scan_skips_domain_that_cannot_be_described(aws_session, scanner):
+    """Test that an AWS error on one domain does not drop the other domains."""
+    opensearch_client = aws_session.get_client("opensearch")
+    opensearch_client.create_domain(DomainName="idle-domain")
+    # The first domain no longer exists by the time it is described
+    opensearch_client.list_domain_names = MagicMock(
+        return_value={"DomainNames": [{"DomainName": "missing-domain"}, {"DomainName": "idle-domain"}]}
+    )
+    aws_session.get_client.side_effect = lambda service_name: (
+        opensearch_client if service_name == "opensearch" else boto3.client(service_name, region_name="us-east-1")
+    )
+
+    unused_clusters = scanner.scan(aws_session)
+
+    assert [cluster["DomainName"] for cluster in unused_clusters] == ["idle-domain"]
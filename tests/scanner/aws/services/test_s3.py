@@ -0,0 +1,35 @@
+import boto3
+import pytest
+from unittest.mock import MagicMock
+from moto import mock_aws
+from scanner.aws.services.s3 import S3Scanner
+
+
+@pytest.fixture
+def aws_session():
+    """Fixture providing a session manager backed by mocked AWS clients."""
+    with mock_aws():
+        session = MagicMock()
+        session.region_name = "eu-west-1"
+        session.get_client.side_effect = lambda service_name: boto3.client(service_name, region_name="eu-west-1")
+        yield session
+
+
+def _create_bucket(session, name):
+    session.get_client("s3").create_bucket(
+        Bucket=name,
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-1"},
+    )
+
+
+def test_scan_reports_only_empty_buckets(aws_session):
+    """Test that empty buckets are reported and buckets holding objects are not."""
+    _create_bucket(aws_session, "empty-bucket")
+    _create_bucket(aws_session, "used-bucket")
+    aws_session.get_client("s3").put_object(Bucket="used-bucket", Key="data.txt", Body=b"data")
+
+    unused_buckets = S3Scanner().scan(aws_session)
+
+    assert [bucket["ResourceName"] for bucket in unused_buckets] == ["empty-bucket"]
+    assert unused_buckets[0]["Reason"] == "No objects in bucket."
+    assert unused_buckets[0]["ObjectCount"] == 0
@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import patch
+from scanner.aws.cost_estimator import CostEstimator
+
+
+@pytest.fixture
+def cost_estimator(tmp_path):
+    """Fixture to create a CostEstimator with a mocked pricing client and its price cache in a temporary directory."""
+    with patch("scanner.aws.cost_estimator.boto3.client"):
+        yield CostEstimator(cache_file=str(tmp_path / "cost_estimator.json"))
+
+
+@pytest.mark.parametrize("resource_type", ["EBS Volumes", "EBS Snapshots"])
+def test_calculate_storage_costs_matches_calculate_cost(cost_estimator, resource_type):
+    """Test that the vectorized storage costs match the costs calculated one resource at a time."""
+    resource_sizes = [8, 100, 0]
+    hours_running = [24, 2160.5, 0]
+
+    with patch.object(cost_estimator, "_get_resource_price", return_value=0.08) as mock_get_price:
+        costs = cost_estimator.calculate_storage_costs(resource_type, resource_sizes, hours_running)
+        expected_costs = [
+            cost_estimator.calculate_cost(resource_type, resource_size=size, hours_running=hours)
+            for size, hours in zip(resource_sizes, hours_running)
+        ]
+
+    assert costs == [pytest.approx(expected_cost) for expected_cost in expected_costs]
+    # The price is looked up once for the whole batch
+    assert mock_get_price.call_args_list[0].args == (resource_type,)
+    assert mock_get_price.call_count == 1 + len(resource_sizes)
+
+
+def test_calculate_storage_costs_without_price(cost_estimator):
+    """Test that every cost is None when the price is unavailable."""
+    with patch.object(cost_estimator, "_get_resource_price", return_value=None):
+        assert cost_estimator.calculate_storage_costs("EBS Volumes", [8, 16], [24, 48]) == [None, None]
+
+
+def test_calculate_storage_costs_rejects_other_resource_types(cost_estimator):
+    """Test that resource types not priced per GB are rejected."""
+    with patch.object(cost_estimator, "_get_resource_price") as mock_get_price:
+        with pytest.raises(ValueError, match="EC2 Instances"):
+            cost_estimator.calculate_storage_costs("EC2 Instances", [1], [24])
+
+    mock_get_price.assert_not_called()
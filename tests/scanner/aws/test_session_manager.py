@@ -1,3 +1,5 @@
+import pickle
+import boto3
 import pytest
 from unittest.mock import MagicMock, patch
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
@@ -251,3 +253,36 @@ def test_assume_role_error(mock_session, session_manager):
     with pytest.raises(ClientError):
         session_manager.assume_role(role_name="invalid-role", account_id="123456789012")
 
+
+def test_get_client_reuses_client(mock_session, session_manager):
+    """Test that clients are created once per service and reused."""
+    ec2_client = MagicMock()
+    cloudwatch_client = MagicMock()
+    mock_session.client.side_effect = lambda service_name, config=None: {
+        "ec2": ec2_client, "cloudwatch": cloudwatch_client
+    }[service_name]
+
+    assert session_manager.get_client("ec2") is ec2_client
+    assert session_manager.get_client("ec2") is ec2_client
+    assert session_manager.get_client("cloudwatch") is cloudwatch_client
+    assert mock_session.client.call_count == 2
+    assert mock_session.client.call_args.kwargs["config"].retries == {"max_attempts": 10, "mode": "adaptive"}
+
+
+def test_pickle_preserves_credentials():
+    """Test that a session manager can be pickled for a worker process and keeps its credentials."""
+    session_manager = AWSSessionManager(profile_name="test-profile", account_id="123456789012")
+    session_manager._session = boto3.Session(
+        aws_access_key_id="AKIA", aws_secret_access_key="secret", aws_session_token="token", region_name="us-west-2"
+    )
+    session_manager.region_name = "us-west-2"
+    session_manager.get_client("s3")
+
+    restored = pickle.loads(pickle.dumps(session_manager))
+
+    credentials = restored.get_session().get_credentials().get_frozen_credentials()
+    assert (credentials.access_key, credentials.secret_key, credentials.token) == ("AKIA", "secret", "token")
+    assert restored.get_session().region_name == "us-west-2"
+    assert restored.account_id == "123456789012"
+    assert restored._clients == {}
+    assert restored.get_client("s3").meta.region_name == "us-west-2"
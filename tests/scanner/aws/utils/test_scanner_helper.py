@@ -0,0 +1,50 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from scanner.aws.utils import scanner_helper
+from scanner.aws.utils.scanner_helper import cached_describe
+
+
+@pytest.fixture(autouse=True)
+def empty_describe_cache():
+    """Fixture to isolate the module-level describe cache between tests."""
+    scanner_helper._describe_cache.clear()
+    yield
+    scanner_helper._describe_cache.clear()
+
+
+def make_client(*pages_per_call):
+    """Create a client whose paginator returns the given pages, one list of pages per call."""
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.side_effect = list(pages_per_call)
+    return client
+
+
+@patch("scanner.aws.utils.scanner_helper.time.monotonic")
+def test_cached_describe_reuses_items_within_ttl(mock_monotonic):
+    """Test that items are fetched once and reused until the TTL expires."""
+    client = make_client([{"Volumes": [{"VolumeId": "vol-1"}]}], [{"Volumes": [{"VolumeId": "vol-2"}]}])
+
+    mock_monotonic.return_value = 100
+    assert cached_describe(client, "describe_volumes", "Volumes", ("111", "us-east-1"), 500, ttl=60) == [{"VolumeId": "vol-1"}]
+    mock_monotonic.return_value = 159
+    assert cached_describe(client, "describe_volumes", "Volumes", ("111", "us-east-1"), 500, ttl=60) == [{"VolumeId": "vol-1"}]
+    assert client.get_paginator.return_value.paginate.call_count == 1
+
+    # Once expired, the items are fetched again
+    mock_monotonic.return_value = 160
+    assert cached_describe(client, "describe_volumes", "Volumes", ("111", "us-east-1"), 500, ttl=60) == [{"VolumeId": "vol-2"}]
+    assert client.get_paginator.return_value.paginate.call_count == 2
+    client.get_paginator.return_value.paginate.assert_called_with(PaginationConfig={"PageSize": 500})
+
+
+@patch("scanner.aws.utils.scanner_helper.time.monotonic")
+def test_cached_describe_evicts_expired_entries(mock_monotonic):
+    """Test that the expired items of other accounts and regions are released."""
+    client = make_client([{"Volumes": [{"VolumeId": "vol-1"}]}], [{"Volumes": [{"VolumeId": "vol-2"}]}])
+
+    mock_monotonic.return_value = 100
+    cached_describe(client, "describe_volumes", "Volumes", ("111", "us-east-1"), 500, ttl=60)
+    mock_monotonic.return_value = 200
+    cached_describe(client, "describe_volumes", "Volumes", ("222", "eu-west-1"), 500, ttl=60)
+
+    assert list(scanner_helper._describe_cache) == [("describe_volumes", ("222", "eu-west-1"))]
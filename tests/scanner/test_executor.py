@@ -1,8 +1,10 @@
 import pytest
 import os
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest.mock import MagicMock, patch, call
-from scanner.executor import Executor
+from scanner.executor import Executor, _scan_account_in_process
 from scanner.aws.account_scanner import AWSAccountScanner
 
 @pytest.fixture
@@ -34,6 +36,7 @@ def test_executor_initialization(mock_session_manager):
     assert executor.start_time is None
     assert executor.end_time is None
     assert executor.scan_metrics == {}
+    assert executor.use_processes is False
 
 @patch("os.cpu_count", return_value=11)  # Mocking os.cpu_count to return 11 (or any desired number)
 def test_executor_default_max_workers(mock_session_manager):
@@ -79,6 +82,31 @@ def test_scan_region_scanner(executor, mock_aws_account_scanner, mock_session_ma
     result = executor._scan_region_scanner(mock_scanner, mock_session, account_id, account_name, region, scanner_name)
     assert result is None
 
+@patch("scanner.executor.ResourceScannerRegistry.list_scanners", return_value=["Scanner1", "Scanner2"])
+@patch("scanner.executor.ProcessPoolExecutor", ThreadPoolExecutor)  # Run the worker "processes" in threads
+def test_execute_with_processes(mock_list_scanners, mock_aws_account_scanner, mock_session_manager):
+    """Test that each account is scanned by its own worker when processes are used."""
+    mock_session_manager.assume_destination_role_in_all_accounts.return_value = [
+        MagicMock(get_account_id=MagicMock(return_value=account_id), get_regions=MagicMock(return_value=["us-east-1"]))
+        for account_id in ("111111111111", "222222222222")
+    ]
+    mock_aws_account_scanner.return_value.scan_resources.side_effect = (
+        lambda session, account_id, account_name, regions, scanners: {"account_id": account_id, "scanners": scanners}
+    )
+    executor = Executor(
+        session=mock_session_manager, scanners=["Scanner1", "Scanner2"], regions=["us-east-1"], max_workers=5, use_processes=True
+    )
+
+    results, scan_metrics = executor.execute()
+
+    assert sorted((result["account_id"], result["scanners"][0]) for result in results) == [
+        ("111111111111", "Scanner1"), ("111111111111", "Scanner2"),
+        ("222222222222", "Scanner1"), ("222222222222", "Scanner2"),
+    ]
+    assert scan_metrics["total_scans"] == 4
+    # One account scanner is created per worker, for the session of its account
+    assert mock_aws_account_scanner.call_count == 2
+
 # @patch("scanner.executor.ThreadPoolExecutor")
 # def test_execute(mock_thread_pool_executor, executor, mock_aws_account_scanner, mock_session_manager):
 #     """Test the execute method."""
@@ -157,4 +185,26 @@ def test_scan_metrics(mock_sleep, mock_registry, executor, mock_session_manager)
     # Assert that scan metrics are calculated correctly
     assert executor.scan_metrics["total_scans"] == 52  # 50 from manual + 2 from mock scanners
     #assert executor.scan_metrics["total_run_time"] == 120  # 2 minutes = 120 seconds
-    assert executor.scan_metrics["avg_scans_per_second"] > 0
\ No newline at end of file
+    assert executor.scan_metrics["avg_scans_per_second"] > 0
+
+
+class OfflineSession:
+    """Picklable stand-in for a session manager whose AWS clients cannot be created."""
+
+    def switch_region(self, region, account_id):
+        return self
+
+    def get_client(self, service_name):
+        raise RuntimeError("No AWS access in tests")
+
+
+def test_scan_account_in_spawned_process(tmp_path, monkeypatch):
+    """Test that a spawned worker process registers the scanners and scans an account from any working directory."""
+    monkeypatch.chdir(tmp_path)
+    tasks = [(OfflineSession(), "123456789012", "Test Account", "us-east-1", "s3")]
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as process_executor:
+        results = process_executor.submit(_scan_account_in_process, tasks, 1).result(timeout=60)
+
+    # The S3 scanner was found in the worker's registry and reported nothing, as its client could not be created
+    assert [result["scan_results"]["us-east-1"] for result in results] == [{"s3": []}]